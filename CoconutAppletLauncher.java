@@ -9,6 +9,7 @@ import java.lang.reflect.Method;
 import java.net.URL;
 import java.security.cert.X509Certificate;
 import java.util.*;
+import java.util.concurrent.atomic.AtomicInteger;
 import javax.net.ssl.*;
 import javax.swing.*;
 
@@ -24,19 +25,50 @@ public class CoconutAppletLauncher extends JFrame implements AppletStub, AppletC
     private final boolean embedMode;
 
     private int captureW = 1024, captureH = 768;
+    private KeyEventDispatcher scrollLockDispatcher;
+
+    // Daemon mode: one JVM serves every connect, so a session closing
+    // must not take the others (or the daemon) down with System.exit.
+    private static volatile boolean daemonMode = false;
+    private static volatile boolean daemonInputClosed = false;
+    private static final AtomicInteger SESSIONS = new AtomicInteger();
+
+    // Windows the applet opened for this session, and which session owns
+    // each claimed window in the JVM.  EDT only.  Sessions share one JVM,
+    // so a JVM-wide Window.getWindows() scan would see the others' viewers.
+    private final Set<Window> sessionWindows =
+            Collections.newSetFromMap(new WeakHashMap<>());
+    private static final Map<Window, CoconutAppletLauncher> WINDOW_OWNERS =
+            new WeakHashMap<>();
+    private static int connectSeq = 0;
+    private javax.swing.Timer windowMonitor;
 
     public CoconutAppletLauncher(String className, URL codeBase,
                                   Map<String, String> params,
                                   boolean bridge, boolean embed) throws Exception {
+        // Counted before anything can throw, so the shutdown() on the
+        // failure path below keeps SESSIONS balanced.
+        if (daemonMode) SESSIONS.incrementAndGet();
         this.params = params;
         this.codeBase = codeBase;
         this.documentBase = codeBase;
         this.bridgeMode = bridge;
         this.embedMode = embed;
 
+        try {
+            launch(className);
+        } catch (Exception | Error e) {
+            // Don't leave a half-built undecorated, maximized frame on screen.
+            log("Closing half-started session: " + e);
+            if (daemonMode) shutdown(); else dispose();
+            throw e;
+        }
+    }
+
+    private void launch(String className) throws Exception {
         log("Loading applet class: " + className);
         log("Codebase: " + codeBase);
-        log("Mode: " + (embed ? "embed" : bridge ? "bridge" : "standalone"));
+        log("Mode: " + (embedMode ? "embed" : bridgeMode ? "bridge" : "standalone"));
         for (Map.Entry<String, String> e : params.entrySet())
             log("  " + e.getKey() + " = " + e.getValue());
 
@@ -50,7 +82,7 @@ public class CoconutAppletLauncher extends JFrame implements AppletStub, AppletC
             @Override public void windowClosing(WindowEvent e) { shutdown(); }
         });
 
-        if (embed) {
+        if (embedMode) {
             setUndecorated(true);
             setExtendedState(JFrame.MAXIMIZED_BOTH);
             applet.setPreferredSize(new Dimension(captureW, captureH));
@@ -76,7 +108,7 @@ public class CoconutAppletLauncher extends JFrame implements AppletStub, AppletC
                 + " size=" + applet.getWidth() + "x" + applet.getHeight());
 
         // Try to hide the applet's internal toolbar/menubar for cleaner embed
-        if (embed) {
+        if (embedMode) {
             hideAppletToolbars();
         }
 
@@ -225,20 +257,21 @@ public class CoconutAppletLauncher extends JFrame implements AppletStub, AppletC
     private long lastScrollLock = 0;
 
     private void installScrollLockListener() {
-        KeyboardFocusManager.getCurrentKeyboardFocusManager()
-            .addKeyEventDispatcher(e -> {
-                if (e.getID() == KeyEvent.KEY_PRESSED
-                        && e.getKeyCode() == KeyEvent.VK_SCROLL_LOCK) {
-                    long now = System.currentTimeMillis();
-                    if (now - lastScrollLock < 600) {
-                        log("Double Scroll Lock — exiting");
-                        SwingUtilities.invokeLater(this::shutdown);
-                        return true;
-                    }
-                    lastScrollLock = now;
+        scrollLockDispatcher = e -> {
+            if (e.getID() == KeyEvent.KEY_PRESSED
+                    && e.getKeyCode() == KeyEvent.VK_SCROLL_LOCK) {
+                long now = System.currentTimeMillis();
+                if (now - lastScrollLock < 600) {
+                    log("Double Scroll Lock — exiting");
+                    SwingUtilities.invokeLater(this::shutdown);
+                    return true;
                 }
-                return false;
-            });
+                lastScrollLock = now;
+            }
+            return false;
+        };
+        KeyboardFocusManager.getCurrentKeyboardFocusManager()
+            .addKeyEventDispatcher(scrollLockDispatcher);
     }
 
     // ── Auto-connect ─────────────────────────────────────────────────
@@ -261,10 +294,13 @@ public class CoconutAppletLauncher extends JFrame implements AppletStub, AppletC
                     Object[] args = pt.length == 7
                         ? new Object[]{0, "0", portIndex, portId, portName, ptype, "CCC"}
                         : new Object[]{0, portIndex, portId, portName, ptype, "CCC"};
+                    Set<Window> before = new HashSet<>(Arrays.asList(Window.getWindows()));
+                    int seq = ++connectSeq;
                     log("Calling connect()...");
                     m.invoke(applet, args);
                     log("connect() OK");
-                    hideFrameAfterConnect();
+                    claimWindows(before, true);
+                    hideFrameAfterConnect(before, seq);
                 } catch (Exception e) {
                     log("connect() failed: " + e.getMessage());
                 }
@@ -272,13 +308,33 @@ public class CoconutAppletLauncher extends JFrame implements AppletStub, AppletC
         }, "AutoConnect").start();
     }
 
-    private void hideFrameAfterConnect() {
+    // A window belongs to this session if its owner chain leads back to
+    // this frame or to a window it already claimed, or (with includeNew)
+    // if it is not in the pre-connect snapshot and no session claimed it.
+    private void claimWindows(Set<Window> before, boolean includeNew) {
+        for (Window w : Window.getWindows()) {
+            if (w == this || w instanceof CoconutAppletLauncher
+                    || WINDOW_OWNERS.containsKey(w)) continue;
+            boolean mine = includeNew && !before.contains(w);
+            for (Window o = w.getOwner(); !mine && o != null; o = o.getOwner())
+                mine = o == this || sessionWindows.contains(o);
+            if (mine) {
+                sessionWindows.add(w);
+                WINDOW_OWNERS.put(w, this);
+            }
+        }
+    }
+
+    private void hideFrameAfterConnect(Set<Window> before, int seq) {
         new Thread(() -> {
             try { Thread.sleep(1500); } catch (InterruptedException ignored) {}
             SwingUtilities.invokeLater(() -> {
-                Window[] windows = Window.getWindows();
-                for (Window w : windows) {
-                    if (w != this && w.isVisible() && w.getWidth() > 200) {
+                if (!active) return;
+                // Windows that showed up after connect() returned are only
+                // ours if no other session has connected since.
+                claimWindows(before, seq == connectSeq);
+                for (Window w : sessionWindows) {
+                    if (w.isVisible() && w.getWidth() > 200) {
                         log("Applet opened its own window — hiding launcher frame");
                         setVisible(false);
                         monitorAppletWindows();
@@ -291,23 +347,14 @@ public class CoconutAppletLauncher extends JFrame implements AppletStub, AppletC
     }
 
     private void monitorAppletWindows() {
-        new Thread(() -> {
-            while (active) {
-                try { Thread.sleep(1000); } catch (InterruptedException ignored) {}
-                boolean anyVisible = false;
-                for (Window w : Window.getWindows()) {
-                    if (w != this && w.isVisible()) {
-                        anyVisible = true;
-                        break;
-                    }
-                }
-                if (!anyVisible) {
-                    log("All applet windows closed — shutting down");
-                    SwingUtilities.invokeLater(this::shutdown);
-                    return;
-                }
-            }
-        }, "WindowMonitor").start();
+        windowMonitor = new javax.swing.Timer(1000, e -> {
+            claimWindows(null, false);
+            for (Window w : sessionWindows)
+                if (w.isVisible()) return;
+            log("All applet windows closed — shutting down");
+            shutdown();
+        });
+        windowMonitor.start();
     }
 
     private Method findMethod(String name) {
@@ -321,13 +368,94 @@ public class CoconutAppletLauncher extends JFrame implements AppletStub, AppletC
     private void shutdown() {
         if (!active) return;
         active = false;
+        if (windowMonitor != null) windowMonitor.stop();
         try { applet.stop(); } catch (Exception ignored) {}
         try { applet.destroy(); } catch (Exception ignored) {}
+        if (scrollLockDispatcher != null) {
+            KeyboardFocusManager.getCurrentKeyboardFocusManager()
+                .removeKeyEventDispatcher(scrollLockDispatcher);
+        }
+        for (Window w : sessionWindows) w.dispose();
+        WINDOW_OWNERS.values().removeIf(o -> o == this);
         dispose();
         log("Shutdown complete");
+        if (daemonMode) {
+            SESSIONS.decrementAndGet();
+            exitIfIdle();
+            return;
+        }
         System.exit(0);
     }
 
+    // ── Daemon: one launch request per stdin line ────────────────────
+    //
+    // Each line is "<class>\t<codebase>\tkey=value\t...", i.e. the normal
+    // command-line arguments joined with tabs.  The browser keeps this
+    // JVM alive across connects so only the first one pays for JVM
+    // start-up and class loading.  Once stdin closes (browser exited) the
+    // daemon lingers until the last open session is closed.
+
+    private static void runDaemon() {
+        daemonMode = true;
+        log("Daemon ready");
+        try (BufferedReader in = new BufferedReader(
+                new InputStreamReader(System.in, "UTF-8"))) {
+            String line;
+            while ((line = in.readLine()) != null) {
+                String[] f = line.split("\t");
+                if (f.length < 2) {
+                    if (!line.isEmpty()) {
+                        log("Bad launch request: " + line);
+                        ackLaunch("failed bad launch request");
+                    }
+                    continue;
+                }
+                final String className = f[0];
+                final String codebaseStr = f[1];
+                final Map<String, String> params = parseParams(f, 2);
+                SwingUtilities.invokeLater(() -> {
+                    try {
+                        new CoconutAppletLauncher(className, new URL(codebaseStr),
+                                                  params, false, false);
+                        ackLaunch("ok");
+                    } catch (Exception | Error e) {
+                        log("Launch failed: " + e.getMessage());
+                        e.printStackTrace();
+                        ackLaunch("failed " + e);
+                    }
+                });
+            }
+        } catch (IOException e) {
+            log("Daemon input error: " + e.getMessage());
+        }
+        log("Daemon input closed");
+        daemonInputClosed = true;
+        exitIfIdle();
+    }
+
+    // One stdout line per launch request, once the applet has started or
+    // failed to; the browser counts a launch as in flight until then.
+    private static void ackLaunch(String status) {
+        System.out.println("@@coconut:launch " + status.replace('\n', ' '));
+        System.out.flush();
+    }
+
+    private static void exitIfIdle() {
+        // Queued behind any launch still pending on the EDT.
+        SwingUtilities.invokeLater(() -> {
+            if (daemonInputClosed && SESSIONS.get() <= 0) System.exit(0);
+        });
+    }
+
+    private static Map<String, String> parseParams(String[] args, int from) {
+        Map<String, String> params = new LinkedHashMap<>();
+        for (int i = from; i < args.length; i++) {
+            int eq = args[i].indexOf('=');
+            if (eq > 0) params.put(args[i].substring(0, eq), args[i].substring(eq + 1));
+        }
+        return params;
+    }
+
     // ── AppletStub ───────────────────────────────────────────────────
     @Override public boolean isActive() { return active; }
     @Override public URL getDocumentBase() { return documentBase; }
@@ -374,8 +502,15 @@ public class CoconutAppletLauncher extends JFrame implements AppletStub, AppletC
     // ── Main ─────────────────────────────────────────────────────────
 
     public static void main(String[] args) {
+        if (args.length == 1 && "--daemon".equals(args[0])) {
+            installTrustAll();
+            RepaintManager.currentManager(null).setDoubleBufferingEnabled(true);
+            runDaemon();
+            return;
+        }
         if (args.length < 2) {
             System.err.println("Usage: CoconutAppletLauncher <class> <codebase> [--bridge|--embed] [k=v ...]");
+            System.err.println("       CoconutAppletLauncher --daemon");
             System.exit(1);
         }
 
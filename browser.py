@@ -9,13 +9,22 @@ TLS 1.0 is enabled for legacy HTTPS management interfaces.
 
 import sys
 import os
+import io
+import json
+import functools
+import collections
 import subprocess
 import shutil
 import tempfile
 import urllib.request
+import urllib.error
 import ssl
 import socket
 import threading
+import concurrent.futures
+import hashlib
+import logging
+import sqlite3
 
 # ── Chromium flags (set BEFORE QApplication) ────────────────────────────────
 # NOTE: --proxy-server is added dynamically in main() once we know the port.
@@ -29,15 +38,23 @@ _CHROMIUM_BASE_FLAGS = [
 ]
 sys.argv += _CHROMIUM_BASE_FLAGS
 
+import random
+import re
 import struct
 import time
 
-from PyQt5.QtCore import Qt, QUrl, QSize, QSettings, QStringListModel, QTimer, pyqtSignal
-from PyQt5.QtGui import QIcon, QKeySequence, QFont, QPalette, QColor, QImage, QPainter
+from PyQt5.QtCore import (
+    Qt, QUrl, QSize, QRect, QRectF, QSettings, QStringListModel, QTimer,
+    QAbstractListModel, QModelIndex, QObject, QThread, QMetaObject, QSocketNotifier, pyqtSignal, pyqtSlot,
+    QRunnable, QThreadPool,
+)
+from PyQt5.QtGui import (
+    QIcon, QKeySequence, QFont, QPalette, QColor, QImage, QPainter, QPixmap,
+)
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QTabWidget, QToolBar, QAction,
     QLineEdit, QStatusBar, QWidget, QVBoxLayout, QHBoxLayout,
-    QMenu, QMenuBar, QDialog, QLabel, QListWidget, QListWidgetItem,
+    QMenu, QMenuBar, QDialog, QLabel, QListView,
     QPushButton, QProgressBar, QShortcut, QSizePolicy, QMessageBox,
     QFileDialog, QStyle, QCompleter,
 )
@@ -47,7 +64,10 @@ from PyQt5.QtWebEngineWidgets import (
 )
 from PyQt5.QtNetwork import QSslConfiguration, QSsl
 
+log = logging.getLogger("coconut")
+
 # Domains that Raritan pages redirect to when they think Java is missing.
+# Single source of truth: the injected JS gets its trie generated from this.
 BLOCKED_DOMAINS = [
     "java.sun.com",
     "java.com",
@@ -59,6 +79,41 @@ BLOCKED_DOMAINS = [
     "download.oracle.com",
 ]
 
+# Terminal marker in the reverse-label trie — "." can never be a label.
+_TRIE_END = "."
+
+
+def _build_domain_trie(domains):
+    """Build a nested-dict trie keyed on reversed host labels.
+
+    ``["java.com"]`` becomes ``{"com": {"java": {".": 1}}}``; it is emitted
+    into the injected JS so isBlocked() walks one object per host label.
+    """
+    trie = {}
+    for domain in domains:
+        node = trie
+        for label in reversed(domain.lower().split(".")):
+            node = node.setdefault(label, {})
+        node[_TRIE_END] = 1
+    return trie
+
+
+_BLOCKED_TRIE = _build_domain_trie(BLOCKED_DOMAINS)
+
+# Python-side lookup tables: exact hosts plus a suffix tuple that
+# str.endswith() scans in a single C-level loop.
+_BLOCKED_EXACT = frozenset(BLOCKED_DOMAINS)
+_BLOCKED_SUFFIX = tuple("." + d for d in BLOCKED_DOMAINS)
+
+# Raritan consoles the injected scripts activate on: the configured
+# target plus any extra hosts listed (comma-separated) in COCONUT_KVM_HOSTS.
+RARITAN_HOSTS = frozenset(
+    h.strip().split(":")[0].rstrip(".").lower()
+    for h in [os.environ.get("COCONUT_TARGET", "10.1.10.36"),
+              *os.environ.get("COCONUT_KVM_HOSTS", "").split(",")]
+    if h.strip()
+)
+
 # User-Agent: IE 11 on Windows 7 with Java/1.8.0_201 appended — this is
 # exactly what the JRE adds to the UA string when installed on Windows.
 USER_AGENT = (
@@ -78,7 +133,19 @@ TEXT_PRIMARY   = "#e2e2f0"
 TEXT_SECONDARY = "#9090b0"
 TAB_ACTIVE_BG = "#332e55"
 
-STYLESHEET = f"""
+_PALETTE = {
+    "DARK_BG": DARK_BG,
+    "DARK_SURFACE": DARK_SURFACE,
+    "DARK_BORDER": DARK_BORDER,
+    "ACCENT": ACCENT,
+    "ACCENT_HOVER": ACCENT_HOVER,
+    "TEXT_PRIMARY": TEXT_PRIMARY,
+    "TEXT_SECONDARY": TEXT_SECONDARY,
+    "TAB_ACTIVE_BG": TAB_ACTIVE_BG,
+}
+
+# Application-wide Qt stylesheet; {NAME} placeholders come from a palette.
+_QSS_TEMPLATE = """
 QMainWindow {{
     background-color: {DARK_BG};
 }}
@@ -186,13 +253,13 @@ QMessageBox {{
 QLabel {{
     color: {TEXT_PRIMARY};
 }}
-QListWidget {{
+QListView#bookmarks {{
     background: {DARK_BG};
     color: {TEXT_PRIMARY};
     border: 1px solid {DARK_BORDER};
     border-radius: 6px;
 }}
-QListWidget::item:selected {{
+QListView#bookmarks::item:selected {{
     background: {ACCENT};
 }}
 QPushButton {{
@@ -209,6 +276,48 @@ QPushButton:hover {{
 """
 
 
+def build_stylesheet(palette):
+    """Render the application stylesheet for a colour palette."""
+    return _QSS_TEMPLATE.format_map(palette)
+
+
+STYLESHEET = build_stylesheet(_PALETTE)
+
+
+# ── Early exit shared by every injected script ─────────────────────────────
+# QtWebEngine has no per-host filter for user scripts, so each one bails
+# out before doing any work on pages that are not Raritan consoles.
+_RARITAN_ONLY_JS = r"""
+    var _RARITAN_HOSTS = """ + json.dumps(sorted(RARITAN_HOSTS)) + r""";
+    if (_RARITAN_HOSTS.indexOf(location.hostname.replace(/\.+$/, '')) === -1) return;
+"""
+
+
+# ── isBlocked() helper shared by the main-world and isolated-world scripts ──
+_IS_BLOCKED_JS = r"""
+    // ── Domains we never allow a redirect to ───────────────────────────
+    // Reverse-label trie generated from BLOCKED_DOMAINS on the Python side.
+    var BLOCKED_TRIE = """ + json.dumps(_BLOCKED_TRIE, separators=(",", ":")) + r""";
+    var _has = Object.prototype.hasOwnProperty;
+
+    function isBlocked(url) {
+        if (!url || typeof url !== 'string') return false;
+        var host;
+        try { host = new URL(url, document.baseURI).hostname; } catch(e) { return false; }
+        // "ads.example.com." is the same host; drop the root label.
+        var labels = host.toLowerCase().replace(/\.+$/, '').split('.').reverse();
+        var node = BLOCKED_TRIE;
+        for (var i = 0; i < labels.length; i++) {
+            if (!_has.call(node, labels[i])) return false;
+            node = node[labels[i]];
+            if (_has.call(node, '.')) return true;
+        }
+        return false;
+    }
+
+"""
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 #  JavaScript injected at DocumentCreation (BEFORE any page scripts run).
 #
@@ -222,62 +331,33 @@ QPushButton:hover {{
 JAVA_PLUGIN_EMULATION_JS = r"""
 (function() {
     'use strict';
+""" + _RARITAN_ONLY_JS + r"""
+    // Log every applet stub call (args + return value) to the console.
+    var VERBOSE = false;
 
-    // ── Domains we never allow a redirect to ───────────────────────────
-    var BLOCKED = ['java.sun.com','java.com','oracle.com','javadl.oracle.com',
-                   'javadl.sun.com','download.oracle.com','www.java.com',
-                   'www.oracle.com'];
+""" + _IS_BLOCKED_JS + r"""
+    // ── Block location.replace/assign + window.open to Java sites ─────
+    // One shared factory; each target gets its own try so a location
+    // method that refuses reassignment doesn't skip the others.
+    function _isExitPage(u) { return typeof u === 'string' && u.indexOf('exit.html') !== -1; }
 
-    function isBlocked(url) {
-        if (!url || typeof url !== 'string') return false;
-        for (var i = 0; i < BLOCKED.length; i++) {
-            if (url.indexOf(BLOCKED[i]) !== -1) return true;
-        }
-        return false;
+    function _wrapBlock(obj, m, blockedRet, alsoBlock) {
+        try {
+            var orig = obj[m];
+            obj[m] = function(...args) {
+                var u = args[0];
+                if (isBlocked(u) || (alsoBlock && alsoBlock(u))) {
+                    console.log('[Coconut] Blocked ' + m + ' -> ' + u);
+                    return blockedRet;
+                }
+                return orig.apply(obj, args);
+            };
+        } catch(e) {}
     }
-
-    // ── Block location.replace / location.assign ───────────────────────
-    try {
-        var _replace = window.location.replace.bind(window.location);
-        window.location.replace = function(u) {
-            if (isBlocked(u)) { console.log('[Coconut] Blocked redirect -> ' + u); return; }
-            if (u === 'exit.html' || (u && u.indexOf('exit.html') !== -1)) {
-                console.log('[Coconut] Blocked redirect -> exit.html');
-                return;
-            }
-            return _replace(u);
-        };
-    } catch(e) {}
-    try {
-        var _assign = window.location.assign.bind(window.location);
-        window.location.assign = function(u) {
-            if (isBlocked(u)) { console.log('[Coconut] Blocked redirect -> ' + u); return; }
-            return _assign(u);
-        };
-    } catch(e) {}
-
-    // ── Block window.open to Java download sites ───────────────────────
-    var _open = window.open;
-    window.open = function(u) {
-        if (isBlocked(u)) { console.log('[Coconut] Blocked popup -> ' + u); return null; }
-        return _open.apply(window, arguments);
-    };
-
-    // ── Block <meta http-equiv="refresh"> pointing to Java sites ───────
-    try {
-        var metaObs = new MutationObserver(function(muts) {
-            muts.forEach(function(m) {
-                m.addedNodes.forEach(function(n) {
-                    if (n.tagName === 'META' && n.httpEquiv &&
-                        n.httpEquiv.toLowerCase() === 'refresh' &&
-                        n.content && isBlocked(n.content)) {
-                        n.remove();
-                    }
-                });
-            });
-        });
-        metaObs.observe(document.documentElement || document, { childList: true, subtree: true });
-    } catch(e) {}
+    [[window.location, 'replace', undefined, _isExitPage],
+     [window.location, 'assign',  undefined, null],
+     [window,          'open',    null,      null]
+    ].forEach(function(t) { _wrapBlock(t[0], t[1], t[2], t[3]); });
 
     // ── navigator.javaEnabled() -> true ─────────────────────────────────
     try {
@@ -301,39 +381,36 @@ JAVA_PLUGIN_EMULATION_JS = r"""
     javaPlugin[1] = mimeBean;
     javaPlugin[2] = mimeJNLP;
 
+    // Both shims are built in one pass from a flat array and frozen, so
+    // their shape never changes after creation.
     try {
         var origPlugins = navigator.plugins;
-        var fakePlugins = {
-            length: origPlugins.length + 1,
-            item:      function(i) { return (i === origPlugins.length) ? javaPlugin : origPlugins.item(i); },
+        var pluginList = Array.prototype.slice.call(origPlugins);
+        pluginList.push(javaPlugin);
+        var pluginNames = {};
+        for (var i = 0; i < pluginList.length; i++) {
+            if (pluginList[i] && pluginList[i].name) pluginNames[pluginList[i].name] = pluginList[i];
+        }
+        var fakePlugins = Object.freeze(Object.assign({}, pluginList, pluginNames, {
+            length:    pluginList.length,
+            item:      function(i) { return pluginList[i] || null; },
             namedItem: function(n) { return (n === javaPlugin.name) ? javaPlugin : origPlugins.namedItem(n); },
             refresh:   function() {}
-        };
-        for (var i = 0; i < origPlugins.length; i++) {
-            fakePlugins[i] = origPlugins[i];
-            if (origPlugins[i] && origPlugins[i].name) fakePlugins[origPlugins[i].name] = origPlugins[i];
-        }
-        fakePlugins[origPlugins.length] = javaPlugin;
-        fakePlugins[javaPlugin.name]    = javaPlugin;
+        }));
         Object.defineProperty(navigator, 'plugins', { get: function() { return fakePlugins; }, configurable: true });
     } catch(e) {}
 
     try {
         var origMimes = navigator.mimeTypes;
         var extraMimes = [mimeApplet, mimeBean, mimeJNLP];
-        var fakeMimes = {
-            length: origMimes.length + extraMimes.length,
-            item:      function(i) { return (i < origMimes.length) ? origMimes.item(i) : extraMimes[i - origMimes.length]; },
-            namedItem: function(n) {
-                for (var j = 0; j < extraMimes.length; j++) { if (extraMimes[j].type === n) return extraMimes[j]; }
-                return origMimes.namedItem(n);
-            }
-        };
-        for (var i = 0; i < origMimes.length; i++) fakeMimes[i] = origMimes[i];
-        for (var j = 0; j < extraMimes.length; j++) {
-            fakeMimes[origMimes.length + j] = extraMimes[j];
-            fakeMimes[extraMimes[j].type]   = extraMimes[j];
-        }
+        var mimeList = Array.prototype.slice.call(origMimes).concat(extraMimes);
+        var mimeNames = {};
+        for (var j = 0; j < extraMimes.length; j++) mimeNames[extraMimes[j].type] = extraMimes[j];
+        var fakeMimes = Object.freeze(Object.assign({}, mimeList, mimeNames, {
+            length:    mimeList.length,
+            item:      function(i) { return mimeList[i] || null; },
+            namedItem: function(n) { return _has.call(mimeNames, n) ? mimeNames[n] : origMimes.namedItem(n); }
+        }));
         Object.defineProperty(navigator, 'mimeTypes', { get: function() { return fakeMimes; }, configurable: true });
     } catch(e) {}
 
@@ -442,37 +519,42 @@ JAVA_PLUGIN_EMULATION_JS = r"""
     // ── IE-specific DOM/BOM shims ─────────────────────────────────────
     if (!document.all) {
         try {
+            // Built on first access as a *live* HTMLCollection, which the
+            // engine keeps current — no querySelectorAll('*') per access.
+            var _all = null;
             Object.defineProperty(document, 'all', {
                 get: function() {
-                    var all = document.querySelectorAll('*');
-                    all.item = function(i) { return all[i]; };
-                    all.tags = function(t) { return document.getElementsByTagName(t); };
-                    all.namedItem = function(n) { return document.getElementById(n) || document.getElementsByName(n)[0]; };
-                    return all;
+                    if (!_all) {
+                        _all = document.getElementsByTagName('*');
+                        _all.tags = function(t) { return document.getElementsByTagName(t); };
+                        _all.namedItem = function(n) { return document.getElementById(n) || document.getElementsByName(n)[0]; };
+                    }
+                    return _all;
                 },
                 configurable: true
             });
         } catch(e) {}
     }
-    if (typeof window.event === 'undefined') {
-        document.addEventListener('click',     function(e) { window.event = e; }, true);
-        document.addEventListener('keydown',   function(e) { window.event = e; }, true);
-        document.addEventListener('keyup',     function(e) { window.event = e; }, true);
-        document.addEventListener('mousemove', function(e) { window.event = e; }, true);
-        document.addEventListener('submit',    function(e) { window.event = e; }, true);
-    }
-    if (!Element.prototype.attachEvent) {
-        Element.prototype.attachEvent = function(evt, fn) { this.addEventListener(evt.replace(/^on/, ''), fn, false); };
-        Element.prototype.detachEvent = function(evt, fn) { this.removeEventListener(evt.replace(/^on/, ''), fn, false); };
-    }
-    if (!window.attachEvent) {
-        window.attachEvent = function(evt, fn) { window.addEventListener(evt.replace(/^on/, ''), fn, false); };
-        window.detachEvent = function(evt, fn) { window.removeEventListener(evt.replace(/^on/, ''), fn, false); };
-    }
-    if (!document.attachEvent) {
-        document.attachEvent = function(evt, fn) { document.addEventListener(evt.replace(/^on/, ''), fn, false); };
-        document.detachEvent = function(evt, fn) { document.removeEventListener(evt.replace(/^on/, ''), fn, false); };
+    // Chromium has a native window.event getter; assigning to it would
+    // replace the getter with a stale value, so only engines without one
+    // get the shim.  There each event is exposed while it dispatches and
+    // cleared by one pending timer afterwards.
+    if (!('event' in window)) {
+        var _evClearPending = false;
+        var _clearEv = function() { _evClearPending = false; window.event = undefined; };
+        var _setEv = function(e) {
+            window.event = e;
+            if (!_evClearPending) { _evClearPending = true; setTimeout(_clearEv, 0); }
+        };
+        ['click', 'keydown', 'keyup', 'mousemove', 'submit'].forEach(function(t) {
+            window.addEventListener(t, _setEv, true);
+        });
     }
+    function _attach(evt, fn) { this.addEventListener(evt.replace(/^on/, ''), fn, false); }
+    function _detach(evt, fn) { this.removeEventListener(evt.replace(/^on/, ''), fn, false); }
+    [Element.prototype, window, document].forEach(function(t) {
+        if (!t.attachEvent) { t.attachEvent = _attach; t.detachEvent = _detach; }
+    });
 
     // ── dtjava.js shim ────────────────────────────────────────────────
     window.dtjava = window.dtjava || {};
@@ -484,21 +566,24 @@ JAVA_PLUGIN_EMULATION_JS = r"""
     window.close = function() { console.log('[Coconut] Blocked window.close()'); };
 
     // ── Intercept confirm/alert that mention Java ─────────────────────
+    var _JAVA_RE = /java|jre|jdk|plug-?in|sun\.com/i;
     var _origConfirm = window.confirm;
-    window.confirm = function(msg) {
-        if (msg && (/java|jre|jdk|plug-?in|sun\.com/i).test(msg)) {
+    window.confirm = function(...args) {
+        var msg = args[0];
+        if (msg && _JAVA_RE.test(msg)) {
             console.log('[Coconut] Auto-cancelled Java confirm');
             return false;
         }
-        return _origConfirm.apply(window, arguments);
+        return _origConfirm.apply(window, args);
     };
     var _origAlert = window.alert;
-    window.alert = function(msg) {
-        if (msg && (/java|jre|jdk|plug-?in|sun\.com/i).test(msg)) {
+    window.alert = function(...args) {
+        var msg = args[0];
+        if (msg && _JAVA_RE.test(msg)) {
             console.log('[Coconut] Suppressed Java alert');
             return;
         }
-        return _origAlert.apply(window, arguments);
+        return _origAlert.apply(window, args);
     };
 
     // ── Global Java / Packages objects (LiveConnect) ──────────────────
@@ -525,44 +610,44 @@ JAVA_PLUGIN_EMULATION_JS = r"""
     // ── Comprehensive applet method stubs ─────────────────────────────
     // Both dpaApplet (dpa.util.Nav) and rcApplet (RemoteConsoleApplet)
     // need method stubs so page JS doesn't crash.
-    // Every stub logs its call for debugging.
+    // Every stub logs its call for debugging when VERBOSE is on.
     function _dbg(appletId, method, args, retVal) {
-        var a = Array.prototype.slice.call(args);
-        console.log('[Coconut][' + appletId + '] ' + method + '(' + a.join(', ') + ')' + (retVal !== undefined ? ' -> ' + JSON.stringify(retVal) : ''));
+        if (!VERBOSE) return retVal;
+        console.log('[Coconut][' + appletId + '] ' + method + '(' + args.join(', ') + ')' + (retVal !== undefined ? ' -> ' + JSON.stringify(retVal) : ''));
         return retVal;
     }
 
     var _appletMethods = {
         // Common
-        enableLiveConnect:              function() { return _dbg(this.id||'?', 'enableLiveConnect', arguments, true); },
+        enableLiveConnect:              function(...args) { return _dbg(this.id||'?', 'enableLiveConnect', args, true); },
         toString:                       function() { return '[JavaApplet ' + (this.id||'') + ']'; },
         // dpaApplet methods
-        validateIPAddress:              function() { return _dbg(this.id||'?', 'validateIPAddress', arguments, 'true'); },
-        getVersion:                     function() { return _dbg(this.id||'?', 'getVersion', arguments, '1.0'); },
-        deleteFromFavorites:            function() { _dbg(this.id||'?', 'deleteFromFavorites', arguments); },
-        writeDeviceToFavorites:         function() { _dbg(this.id||'?', 'writeDeviceToFavorites', arguments); },
-        overwriteDeviceToFavorites:     function() { _dbg(this.id||'?', 'overwriteDeviceToFavorites', arguments); },
-        writeAndShowDeviceToFavorites:  function() { _dbg(this.id||'?', 'writeAndShowDeviceToFavorites', arguments); },
-        getOpenTargets:                 function() { return _dbg(this.id||'?', 'getOpenTargets', arguments, ''); },
-        openTarget:                     function() { return _dbg(this.id||'?', 'openTarget', arguments, true); },
-        closeTarget:                    function() { return _dbg(this.id||'?', 'closeTarget', arguments, true); },
-        isTargetOpen:                   function() { return _dbg(this.id||'?', 'isTargetOpen', arguments, false); },
-        getTargetStatus:                function() { return _dbg(this.id||'?', 'getTargetStatus', arguments, ''); },
-        favListHasThisKey:              function() { return _dbg(this.id||'?', 'favListHasThisKey', arguments, false); },
-        favListHasThisDescr:            function() { return _dbg(this.id||'?', 'favListHasThisDescr', arguments, false); },
-        getSortMethod:                  function() { return _dbg(this.id||'?', 'getSortMethod', arguments, '0'); },
-        setSortMethod:                  function() { _dbg(this.id||'?', 'setSortMethod', arguments); },
-        showEditDeleteFavorites:        function() { _dbg(this.id||'?', 'showEditDeleteFavorites', arguments); },
-        getRetrievalDevice:             function() { _dbg(this.id||'?', 'getRetrievalDevice', arguments); },
-        getRetrievalDeviceKeys:         function() { return _dbg(this.id||'?', 'getRetrievalDeviceKeys', arguments, ''); },
-        getRetrievalDeviceValues:       function() { return _dbg(this.id||'?', 'getRetrievalDeviceValues', arguments, ''); },
-        getBroadcastPort:               function() { return _dbg(this.id||'?', 'getBroadcastPort', arguments, '5000'); },
-        saveBroadcastPort:              function() { _dbg(this.id||'?', 'saveBroadcastPort', arguments); },
-        discoverDevices:                function() { _dbg(this.id||'?', 'discoverDevices', arguments); },
-        addServerDiscoveredToFavorites: function() { _dbg(this.id||'?', 'addServerDiscoveredToFavorites', arguments); },
-        addClientDiscoveredToFavorites: function() { _dbg(this.id||'?', 'addClientDiscoveredToFavorites', arguments); },
+        validateIPAddress:              function(...args) { return _dbg(this.id||'?', 'validateIPAddress', args, 'true'); },
+        getVersion:                     function(...args) { return _dbg(this.id||'?', 'getVersion', args, '1.0'); },
+        deleteFromFavorites:            function(...args) { _dbg(this.id||'?', 'deleteFromFavorites', args); },
+        writeDeviceToFavorites:         function(...args) { _dbg(this.id||'?', 'writeDeviceToFavorites', args); },
+        overwriteDeviceToFavorites:     function(...args) { _dbg(this.id||'?', 'overwriteDeviceToFavorites', args); },
+        writeAndShowDeviceToFavorites:  function(...args) { _dbg(this.id||'?', 'writeAndShowDeviceToFavorites', args); },
+        getOpenTargets:                 function(...args) { return _dbg(this.id||'?', 'getOpenTargets', args, ''); },
+        openTarget:                     function(...args) { return _dbg(this.id||'?', 'openTarget', args, true); },
+        closeTarget:                    function(...args) { return _dbg(this.id||'?', 'closeTarget', args, true); },
+        isTargetOpen:                   function(...args) { return _dbg(this.id||'?', 'isTargetOpen', args, false); },
+        getTargetStatus:                function(...args) { return _dbg(this.id||'?', 'getTargetStatus', args, ''); },
+        favListHasThisKey:              function(...args) { return _dbg(this.id||'?', 'favListHasThisKey', args, false); },
+        favListHasThisDescr:            function(...args) { return _dbg(this.id||'?', 'favListHasThisDescr', args, false); },
+        getSortMethod:                  function(...args) { return _dbg(this.id||'?', 'getSortMethod', args, '0'); },
+        setSortMethod:                  function(...args) { _dbg(this.id||'?', 'setSortMethod', args); },
+        showEditDeleteFavorites:        function(...args) { _dbg(this.id||'?', 'showEditDeleteFavorites', args); },
+        getRetrievalDevice:             function(...args) { _dbg(this.id||'?', 'getRetrievalDevice', args); },
+        getRetrievalDeviceKeys:         function(...args) { return _dbg(this.id||'?', 'getRetrievalDeviceKeys', args, ''); },
+        getRetrievalDeviceValues:       function(...args) { return _dbg(this.id||'?', 'getRetrievalDeviceValues', args, ''); },
+        getBroadcastPort:               function(...args) { return _dbg(this.id||'?', 'getBroadcastPort', args, '5000'); },
+        saveBroadcastPort:              function(...args) { _dbg(this.id||'?', 'saveBroadcastPort', args); },
+        discoverDevices:                function(...args) { _dbg(this.id||'?', 'discoverDevices', args); },
+        addServerDiscoveredToFavorites: function(...args) { _dbg(this.id||'?', 'addServerDiscoveredToFavorites', args); },
+        addClientDiscoveredToFavorites: function(...args) { _dbg(this.id||'?', 'addClientDiscoveredToFavorites', args); },
         // rcApplet methods (RemoteConsoleApplet)
-        getUsedPorts:                   function() { return _dbg(this.id||'?', 'getUsedPorts', arguments, ''); },
+        getUsedPorts:                   function(...args) { return _dbg(this.id||'?', 'getUsedPorts', args, ''); },
         connect: function(type, portold, pindex, portId, pname, ptype, permString) {
             console.log('[Coconut][rcApplet] *** CONNECT REQUESTED ***');
             console.log('[Coconut][rcApplet]   type=' + type + ' portold=' + portold + ' pindex=' + pindex);
@@ -591,72 +676,127 @@ JAVA_PLUGIN_EMULATION_JS = r"""
             console.log('[COCONUT_CONNECT] ' + JSON.stringify(params));
             return true;
         },
-        disconnect:                     function() { return _dbg(this.id||'?', 'disconnect', arguments, true); },
-        getConnectionInfo:              function() { return _dbg(this.id||'?', 'getConnectionInfo', arguments, ''); }
+        disconnect:                     function(...args) { return _dbg(this.id||'?', 'disconnect', args, true); },
+        getConnectionInfo:              function(...args) { return _dbg(this.id||'?', 'getConnectionInfo', args, ''); }
     };
 
-    function patchAllApplets() {
-        var applets = document.querySelectorAll('applet, object[type*="java"]');
-        for (var i = 0; i < applets.length; i++) {
-            var a = applets[i];
-            var patched = false;
-            for (var k in _appletMethods) {
-                if (typeof a[k] !== 'function') {
-                    try { a[k] = _appletMethods[k]; patched = true; } catch(e) {}
-                }
-            }
-            if (patched && a.id) {
-                console.log('[Coconut] Patched applet "' + a.id + '" with method stubs');
+    var _APPLET_SEL = 'applet, object[type*="java"]';
+
+    // Flattened [name, fn] pairs so patching is a plain array walk.
+    var _appletEntries = Object.keys(_appletMethods).map(function(k) {
+        return [k, _appletMethods[k]];
+    });
+
+    function _patchApplet(a) {
+        if (a.__coconutPatched) return;
+        var patched = false;
+        for (var j = 0; j < _appletEntries.length; j++) {
+            var e = _appletEntries[j];
+            if (typeof a[e[0]] !== 'function') {
+                try { a[e[0]] = e[1]; patched = true; } catch(err) {}
             }
         }
+        a.__coconutPatched = true;
+        if (patched && a.id) {
+            console.log('[Coconut] Patched applet "' + a.id + '" with method stubs');
+        }
+    }
+
+    function patchAllApplets() {
+        var applets = document.querySelectorAll(_APPLET_SEL);
+        for (var i = 0; i < applets.length; i++) _patchApplet(applets[i]);
+    }
+
+    // Only the freshly added subtrees are inspected — never the whole DOM.
+    function patchDeltas(nodes) {
+        for (var i = 0; i < nodes.length; i++) {
+            var n = nodes[i];
+            if (n.nodeType !== 1) continue;
+            if (n.matches(_APPLET_SEL)) _patchApplet(n);
+            var inner = n.querySelectorAll(_APPLET_SEL);
+            for (var j = 0; j < inner.length; j++) _patchApplet(inner[j]);
+        }
     }
 
     document.addEventListener('DOMContentLoaded', patchAllApplets);
 
+    // Patching stays inside the observer callback (a microtask) rather than
+    // a requestAnimationFrame: inline scripts that follow an <applet> tag
+    // call its methods before the next frame would be painted.
     try {
         var appletObs = new MutationObserver(function(muts) {
-            var found = false;
+            var deltas = [];
+            for (var i = 0; i < muts.length; i++) {
+                var added = muts[i].addedNodes;
+                for (var j = 0; j < added.length; j++) deltas.push(added[j]);
+            }
+            if (deltas.length) patchDeltas(deltas);
+        });
+        if (document.documentElement) {
+            appletObs.observe(document.documentElement, { childList: true, subtree: true });
+        }
+    } catch(e) {}
+
+    console.log('[Coconut] Java 1.8.0_201 emulation active');
+})();
+"""
+
+
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+#  DOM-only guards, injected at DocumentCreation into the isolated
+#  ApplicationWorld.  They only read and mutate the DOM, so page scripts
+#  never need to see them and the main world stays lean.
+# ═══════════════════════════════════════════════════════════════════════════
+DOM_GUARD_JS = r"""
+(function() {
+    'use strict';
+""" + _RARITAN_ONLY_JS + r"""""" + _IS_BLOCKED_JS + r"""
+    // ── Block <meta http-equiv="refresh"> pointing to Java sites ───────
+    try {
+        var metaObs = new MutationObserver(function(muts) {
             muts.forEach(function(m) {
                 m.addedNodes.forEach(function(n) {
-                    if (n.tagName === 'APPLET' || n.tagName === 'OBJECT' ||
-                        (n.querySelector && n.querySelector('applet, object[type*="java"]'))) {
-                        found = true;
+                    if (n.tagName === 'META' && n.httpEquiv &&
+                        n.httpEquiv.toLowerCase() === 'refresh' && n.content &&
+                        isBlocked(n.content.replace(/^[^;]*;\s*url\s*=\s*['"]?/i, ''))) {
+                        n.remove();
                     }
                 });
             });
-            if (found) patchAllApplets();
         });
-        if (document.documentElement) {
-            appletObs.observe(document.documentElement, { childList: true, subtree: true });
-        }
+        metaObs.observe(document.documentElement || document, { childList: true, subtree: true });
     } catch(e) {}
 
     // ── Hide fallback content inside <applet> tags ────────────────────
     // Browsers render child elements of <applet> when Java is not
     // available.  Inject CSS to hide them (the "Browser has no Java!" text).
     function injectCSS() {
+        if (document.getElementById('__coconut_css')) return true;
         var target = document.head || document.documentElement;
-        if (!target) return;
+        if (!target) return false;
         var style = document.createElement('style');
+        style.id = '__coconut_css';
         style.textContent = 'applet > * { display: none !important; }';
         target.appendChild(style);
+        return true;
     }
-    try { injectCSS(); } catch(e) {}
-    document.addEventListener('DOMContentLoaded', injectCSS);
-
-    console.log('[Coconut] Java 1.8.0_201 emulation active');
+    var _cssDone = false;
+    try { _cssDone = injectCSS(); } catch(e) {}
+    if (!_cssDone) document.addEventListener('DOMContentLoaded', injectCSS);
 })();
 """
 
 
-
-
 # ═══════════════════════════════════════════════════════════════════════════
 #  Post-load cleanup: hides "Java not found" fallback content and
-#  ensures all applet stubs are in place.  Runs after the page finishes.
+#  ensures all applet stubs are in place.  Runs on DOMContentLoaded,
+#  scheduled from COMBINED_JS below.
 # ═══════════════════════════════════════════════════════════════════════════
 PAGE_CLEANUP_JS = r"""
 (function() {
+""" + _RARITAN_ONLY_JS + r"""
     // Hide fallback content inside <applet> tags ("Browser has no Java!")
     document.querySelectorAll('applet').forEach(function(a) {
         for (var i = 0; i < a.children.length; i++) {
@@ -689,46 +829,96 @@ PAGE_CLEANUP_JS = r"""
 """
 
 
-RARITAN_HOSTS = {"10.1.10.36"}
+@functools.lru_cache(maxsize=None)
+def _minify_js(js):
+    """Drop full-line ``//`` comments, indentation and blank lines.
+
+    Line breaks are kept so automatic semicolon insertion is unaffected,
+    and nothing inside a line is touched, so string and regex literals
+    containing ``//`` survive intact.
+    """
+    lines = (line.strip() for line in js.splitlines())
+    return "\n".join(l for l in lines if l and not l.startswith("//"))
+
+
+# One main-world compile unit: the emulation runs at DocumentCreation and
+# schedules the post-load cleanup itself instead of a second script.
+COMBINED_JS = (
+    JAVA_PLUGIN_EMULATION_JS
+    + "\ndocument.addEventListener('DOMContentLoaded', function() {"
+    + PAGE_CLEANUP_JS
+    + "});\n"
+)
+
+COMBINED_JS_MIN = _minify_js(COMBINED_JS)
+DOM_GUARD_JS_MIN = _minify_js(DOM_GUARD_JS)
+
+
+# The TLS 1.0 default configuration, assembled once by _configure_global_ssl().
+_SSL_CFG = None
 
 
 def _configure_global_ssl():
+    global _SSL_CFG
+    if _SSL_CFG is not None:
+        return _SSL_CFG
     config = QSslConfiguration.defaultConfiguration()
     config.setProtocol(QSsl.TlsV1_0)
     QSslConfiguration.setDefaultConfiguration(config)
+    _SSL_CFG = config
+    return config
+
+
+@functools.lru_cache(maxsize=None)
+def _build_user_scripts():
+    """Build the injected QWebEngineScripts once; every profile reuses them."""
+    specs = (
+        # name, source, injection point, world
+        ("TLS1_JavaEmulation", COMBINED_JS_MIN,
+         QWebEngineScript.DocumentCreation, QWebEngineScript.MainWorld),
+        ("Coconut_DomGuard", DOM_GUARD_JS_MIN,
+         QWebEngineScript.DocumentCreation, QWebEngineScript.ApplicationWorld),
+    )
+    built = []
+    for name, source, point, world in specs:
+        s = QWebEngineScript()
+        s.setName(name)
+        s.setSourceCode(source)
+        s.setInjectionPoint(point)
+        s.setWorldId(world)
+        s.setRunsOnSubFrames(True)
+        built.append(s)
+    return tuple(built)
 
 
 def _install_user_scripts(profile: QWebEngineProfile):
     scripts = profile.scripts()
+    for s in _build_user_scripts():
+        if scripts.findScript(s.name()).isNull():
+            scripts.insert(s)
 
-    s1 = QWebEngineScript()
-    s1.setName("TLS1_JavaEmulation")
-    s1.setSourceCode(JAVA_PLUGIN_EMULATION_JS)
-    s1.setInjectionPoint(QWebEngineScript.DocumentCreation)
-    s1.setWorldId(QWebEngineScript.MainWorld)
-    s1.setRunsOnSubFrames(True)
-    scripts.insert(s1)
 
-    s2 = QWebEngineScript()
-    s2.setName("Coconut_PageCleanup")
-    s2.setSourceCode(PAGE_CLEANUP_JS)
-    s2.setInjectionPoint(QWebEngineScript.DocumentReady)
-    s2.setWorldId(QWebEngineScript.MainWorld)
-    s2.setRunsOnSubFrames(True)
-    scripts.insert(s2)
+@functools.lru_cache(maxsize=1024)
+def _host_blocked(host: str) -> bool:
+    return host in _BLOCKED_EXACT or host.endswith(_BLOCKED_SUFFIX)
 
 
 def _is_blocked_url(url: QUrl) -> bool:
-    host = url.host().lower()
-    for d in BLOCKED_DOMAINS:
-        if host == d or host.endswith("." + d):
-            return True
-    return False
+    return _host_blocked(url.host().lower().rstrip("."))
 
 
 # ── Custom page: blocks Java-site redirects + handles applets ──────────────
+# Page console output is only echoed for errors unless this is set.
+_DEBUG_JS_LOG = bool(os.environ.get("COCONUT_DEBUG_JS"))
+
+# Prefix the connect hook in JAVA_PLUGIN_EMULATION_JS logs parameters with.
+_CONNECT_PREFIX = "[COCONUT_CONNECT] "
+
+
 class BrowserPage(QWebEnginePage):
-    _JAVA_KEYWORDS = ("java", "jre", "jdk", "plug-in", "plugin", "sun.com")
+    # One case-insensitive scan instead of lower() + a substring test per
+    # keyword; same words as the JS-side _JAVA_RE.
+    _JAVA_RE = re.compile(r"java|jre|jdk|plug-?in|sun\.com", re.IGNORECASE)
 
     def __init__(self, profile, parent=None):
         super().__init__(profile, parent)
@@ -740,41 +930,40 @@ class BrowserPage(QWebEnginePage):
 
     # ── Auto-dismiss Java-related JS dialogs ────────────────────────────
     def javaScriptAlert(self, origin, msg):
-        if any(kw in msg.lower() for kw in self._JAVA_KEYWORDS):
-            print(f"[SUPPRESSED ALERT] {msg}", flush=True)
+        if self._JAVA_RE.search(msg):
+            log.info("[SUPPRESSED ALERT] %s", msg)
             return
         super().javaScriptAlert(origin, msg)
 
     def javaScriptConfirm(self, origin, msg):
-        if any(kw in msg.lower() for kw in self._JAVA_KEYWORDS):
-            print(f"[SUPPRESSED CONFIRM → Cancel] {msg}", flush=True)
+        if self._JAVA_RE.search(msg):
+            log.info("[SUPPRESSED CONFIRM → Cancel] %s", msg)
             return False
         return super().javaScriptConfirm(origin, msg)
 
     def acceptNavigationRequest(self, url, nav_type, is_main_frame):
         if _is_blocked_url(url):
-            print(f"[NAV BLOCKED] {url.toString()}", flush=True)
+            log.info("[NAV BLOCKED] %s", url.toString())
             return False
         path = url.path().lower()
         if path.endswith("exit.html") or path.endswith("exit.asp"):
-            print(f"[NAV BLOCKED] exit page: {url.toString()}", flush=True)
+            log.info("[NAV BLOCKED] exit page: %s", url.toString())
             return False
         return True
 
     def javaScriptConsoleMessage(self, level, message, line, source_id):
-        tag = ["INFO", "WARN", "ERROR"][min(level, 2)]
-        print(f"[JS {tag}] {source_id}:{line}  {message}", flush=True)
+        if level >= 2 or _DEBUG_JS_LOG:
+            tag = ["INFO", "WARN", "ERROR"][min(level, 2)]
+            log.info("[JS %s] %s:%s  %s", tag, source_id, line, message)
 
-        if "[COCONUT_CONNECT]" in message:
-            import json
+        if message.startswith(_CONNECT_PREFIX):
             try:
-                json_str = message.split("[COCONUT_CONNECT] ", 1)[1]
-                params = json.loads(json_str)
+                params = json.loads(message[len(_CONNECT_PREFIX):])
                 main = self.view().window()
                 if isinstance(main, BrowserWindow):
                     main._launch_kvm_viewer(params)
             except Exception as e:
-                print(f"[Coconut] Failed to parse connect params: {e}", flush=True)
+                log.warning("Failed to parse connect params: %s", e)
 
     def createWindow(self, window_type):
         main = self.view().window()
@@ -804,6 +993,35 @@ class BrowserTab(QWebEngineView):
         return self.page().createWindow(window_type)
 
 
+class BookmarkModel(QAbstractListModel):
+    """Read-through view of the ``(title, url)`` bookmark list."""
+
+    def __init__(self, bookmarks, parent=None):
+        super().__init__(parent)
+        self.bookmarks = bookmarks
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.bookmarks)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        title, url = self.bookmarks[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{title}\n{url}"
+        if role == Qt.UserRole:
+            return url
+        return None
+
+    def removeRow(self, row, parent=QModelIndex()):
+        if not 0 <= row < len(self.bookmarks):
+            return False
+        self.beginRemoveRows(parent, row, row)
+        del self.bookmarks[row]
+        self.endRemoveRows()
+        return True
+
+
 class BookmarkDialog(QDialog):
     def __init__(self, bookmarks, parent=None):
         super().__init__(parent)
@@ -813,12 +1031,11 @@ class BookmarkDialog(QDialog):
         self.selected_url = None
 
         layout = QVBoxLayout(self)
-        self.list_widget = QListWidget()
-        for title, url in self.bookmarks:
-            item = QListWidgetItem(f"{title}\n{url}")
-            item.setData(Qt.UserRole, url)
-            self.list_widget.addItem(item)
-        layout.addWidget(self.list_widget)
+        self.model = BookmarkModel(self.bookmarks, self)
+        self.list_view = QListView()
+        self.list_view.setObjectName("bookmarks")
+        self.list_view.setModel(self.model)
+        layout.addWidget(self.list_view)
 
         btn_row = QHBoxLayout()
         open_btn = QPushButton("Open")
@@ -830,16 +1047,15 @@ class BookmarkDialog(QDialog):
         layout.addLayout(btn_row)
 
     def _open(self):
-        item = self.list_widget.currentItem()
-        if item:
-            self.selected_url = item.data(Qt.UserRole)
+        index = self.list_view.currentIndex()
+        if index.isValid():
+            self.selected_url = index.data(Qt.UserRole)
             self.accept()
 
     def _delete(self):
-        row = self.list_widget.currentRow()
-        if row >= 0:
-            self.list_widget.takeItem(row)
-            del self.bookmarks[row]
+        index = self.list_view.currentIndex()
+        if index.isValid():
+            self.model.removeRow(index.row())
 
 
 # ── KVM Viewer Widget (embedded frame-streaming viewer) ─────────────────────
@@ -856,45 +1072,149 @@ _QT_TO_JAVA_KEY = {
     Qt.Key_Space: 32,
 }
 
+# Wire formats for the launcher's event pipe, parsed once at import.
+_MOUSE_ST = struct.Struct('>HHB')     # x, y, button mask
+_KEY_ST = struct.Struct('>iBB')       # Java key code, pressed, modifiers
+_MOUSE_PACK = _MOUSE_ST.pack
+_KEY_PACK = _KEY_ST.pack
+
+
+@functools.lru_cache(maxsize=None)
+def _sck_output_class():
+    """Define the ScreenCaptureKit ``SCStreamOutput`` delegate on first use.
+
+    Built lazily because PyObjC and ScreenCaptureKit only exist on macOS.
+    """
+    import objc
+    from Foundation import NSObject
+
+    class CoconutFrameOutput(NSObject,
+                             protocols=[objc.protocolNamed("SCStreamOutput")]):
+        def initWithCallback_(self, callback):
+            self = objc.super(CoconutFrameOutput, self).init()
+            if self is None:
+                return None
+            self._callback = callback
+            return self
+
+        def stream_didOutputSampleBuffer_ofType_(self, stream, sample_buffer,
+                                                 output_type):
+            self._callback(sample_buffer)
+
+    return CoconutFrameOutput
+
+
+def _sample_buffer_to_qimage(sample_buffer):
+    """Copy a BGRA ``CMSampleBuffer`` into a QImage, or None for idle frames."""
+    from CoreMedia import CMSampleBufferGetImageBuffer
+    from Quartz import (CVPixelBufferLockBaseAddress,
+                        CVPixelBufferUnlockBaseAddress,
+                        CVPixelBufferGetBaseAddress,
+                        CVPixelBufferGetBytesPerRow,
+                        CVPixelBufferGetWidth, CVPixelBufferGetHeight,
+                        kCVPixelBufferLock_ReadOnly)
+
+    pixbuf = CMSampleBufferGetImageBuffer(sample_buffer)
+    if pixbuf is None:
+        return None     # status-only sample: the window did not change
+    CVPixelBufferLockBaseAddress(pixbuf, kCVPixelBufferLock_ReadOnly)
+    try:
+        w = CVPixelBufferGetWidth(pixbuf)
+        h = CVPixelBufferGetHeight(pixbuf)
+        bpr = CVPixelBufferGetBytesPerRow(pixbuf)
+        data = CVPixelBufferGetBaseAddress(pixbuf).as_buffer(bpr * h)
+        # BGRA in memory is exactly Format_RGB32 on little-endian; copy
+        # before the pixel buffer is unlocked and recycled.
+        return QImage(data, w, h, bpr, QImage.Format_RGB32).copy()
+    finally:
+        CVPixelBufferUnlockBaseAddress(pixbuf, kCVPixelBufferLock_ReadOnly)
+
+
+def _sample_buffer_dirty_rect(sample_buffer):
+    """Union of ScreenCaptureKit's dirty rects, as (x, y, w, h) in frame
+    pixels, or None when the frame carries no dirty-rect information."""
+    from CoreMedia import CMSampleBufferGetSampleAttachmentsArray
+    from Quartz import CGRectMakeWithDictionaryRepresentation
+    from ScreenCaptureKit import SCStreamFrameInfoDirtyRects
+
+    attachments = CMSampleBufferGetSampleAttachmentsArray(sample_buffer, False)
+    if not attachments:
+        return None
+    rects = attachments[0].get(SCStreamFrameInfoDirtyRects)
+    if not rects:
+        return None
+    x0 = y0 = float("inf")
+    x1 = y1 = float("-inf")
+    for d in rects:
+        ok, r = CGRectMakeWithDictionaryRepresentation(d, None)
+        if not ok:
+            return None
+        x0 = min(x0, r.origin.x)
+        y0 = min(y0, r.origin.y)
+        x1 = max(x1, r.origin.x + r.size.width)
+        y1 = max(y1, r.origin.y + r.size.height)
+    return (x0, y0, x1 - x0, y1 - y0)
 
-class KvmViewerWidget(QWidget):
-    """Captures the Java applet window via macOS Quartz and forwards
-    keyboard/mouse events through the subprocess pipes."""
 
-    disconnected = pyqtSignal()
+class CaptureWorker(QObject):
+    """Polls the Java applet window with CGWindowListCreateImage.
 
-    def __init__(self, proc, parent=None):
-        super().__init__(parent)
-        self._proc = proc
-        self._current_frame = None
-        self._scroll_lock_time = 0.0
-        self._alive = True
-        self._java_wid = None
-        self._frame_w = 1024
-        self._frame_h = 768
+    Lives on its own QThread so a slow WindowServer round trip never
+    holds up input forwarding on the GUI thread.  Each frame is emitted
+    with the CFData it borrows; the receiver keeps that alive for as
+    long as it uses the image.
+    """
 
-        self.setFocusPolicy(Qt.StrongFocus)
-        self.setMouseTracking(True)
-        self.setCursor(Qt.BlankCursor)
+    frameReady = pyqtSignal(QImage, object)
+    windowFound = pyqtSignal(int, int, int)
+    windowLost = pyqtSignal()
 
-        self.disconnected.connect(self._on_disconnect)
+    # Floor for the polling interval; the actual interval adapts to how
+    # long each grab takes (see _capture_frame).
+    _CAPTURE_MIN_MS = 16
 
-        self._capture_timer = QTimer(self)
-        self._capture_timer.timeout.connect(self._capture_frame)
-        QTimer.singleShot(2000, lambda: self._capture_timer.start(33))
+    def __init__(self, pid):
+        super().__init__()
+        self._pid = pid
+        self._java_wid = None
+        self._timer = None
+        self._capture_dt = 0.0
+        self._null_logged = False
 
-        self._poll_timer = QTimer(self)
-        self._poll_timer.timeout.connect(self._check_proc)
-        self._poll_timer.start(500)
+    @pyqtSlot()
+    def start(self):
+        # Created here so the timer belongs to the capture thread.  It is
+        # single-shot and re-armed by _capture_frame, so the next grab is
+        # only queued once the previous one has finished.
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._capture_frame)
+        self._timer.start(2000)
+
+    @pyqtSlot()
+    def stop(self):
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
 
     def _find_java_window(self):
-        """Find the Java applet window named 'CoconutKVM' by PID."""
+        """Find the Java applet window named 'CoconutKVM' by PID.
+
+        The result is cached in ``self._java_wid`` and only re-scanned
+        after ``_invalidate_java_window``; the scan itself
+        asks the WindowServer for on-screen, non-desktop windows only,
+        which is a far shorter list than every window in the session.
+        """
         try:
             from Quartz import (CGWindowListCopyWindowInfo,
-                                kCGWindowListOptionAll, kCGNullWindowID)
+                                kCGWindowListOptionOnScreenOnly,
+                                kCGWindowListExcludeDesktopElements,
+                                kCGNullWindowID)
             windows = CGWindowListCopyWindowInfo(
-                kCGWindowListOptionAll, kCGNullWindowID)
-            pid = self._proc.pid
+                kCGWindowListOptionOnScreenOnly
+                | kCGWindowListExcludeDesktopElements,
+                kCGNullWindowID) or ()
+            pid = self._pid
             for w in windows:
                 if w.get('kCGWindowOwnerPID', 0) != pid:
                     continue
@@ -904,23 +1224,34 @@ class KvmViewerWidget(QWidget):
                 bw = int(bounds.get('Width', 0))
                 bh = int(bounds.get('Height', 0))
                 if name == 'CoconutKVM' and bw > 100 and bh > 100:
-                    self._frame_w = bw
-                    self._frame_h = bh
-                    print(f"[Coconut] Found Java window: id={wid} "
-                          f"size={bw}x{bh}", flush=True)
+                    log.info("Found Java window: id=%s size=%sx%s",
+                             wid, bw, bh)
+                    self.windowFound.emit(wid, bw, bh)
                     return wid
         except Exception as e:
-            print(f"[Coconut] Window search error: {e}", flush=True)
+            log.warning("Window search error: %s", e)
         return None
 
+    def _invalidate_java_window(self):
+        """Forget the cached window ID so the next tick re-scans."""
+        self._java_wid = None
+        self.windowLost.emit()
+
     def _capture_frame(self):
-        """Capture the Java window using CGWindowListCreateImage."""
-        if not self._alive:
+        """Grab one frame, then schedule the next from how long it took."""
+        t0 = time.perf_counter()
+        self._grab_frame()
+        if self._timer is None:
             return
-        if self._proc.poll() is not None:
-            self._on_disconnect()
-            return
-
+        # EWMA of the grab time; back off when the WindowServer is slow
+        # instead of letting timer ticks pile up behind it.
+        dt = time.perf_counter() - t0
+        self._capture_dt = 0.8 * self._capture_dt + 0.2 * dt
+        self._timer.start(
+            max(self._CAPTURE_MIN_MS, int(self._capture_dt * 1100)))
+
+    def _grab_frame(self):
+        """Capture the Java window using CGWindowListCreateImage."""
         if self._java_wid is None:
             self._java_wid = self._find_java_window()
             if self._java_wid is None:
@@ -933,9 +1264,7 @@ class KvmViewerWidget(QWidget):
                                 kCGWindowImageBoundsIgnoreFraming,
                                 CGImageGetWidth, CGImageGetHeight,
                                 CGImageGetBytesPerRow, CGImageGetDataProvider,
-                                CGDataProviderCopyData,
-                                CGImageGetBitsPerPixel,
-                                CGImageGetAlphaInfo)
+                                CGDataProviderCopyData)
 
             cg_image = CGWindowListCreateImage(
                 CGRectNull,
@@ -944,58 +1273,265 @@ class KvmViewerWidget(QWidget):
                 kCGWindowImageBoundsIgnoreFraming)
 
             if cg_image is None:
-                if not hasattr(self, '_null_logged'):
-                    print("[Coconut] CGWindowListCreateImage returned None",
-                          flush=True)
+                if not self._null_logged:
+                    log.debug("CGWindowListCreateImage returned None")
                     self._null_logged = True
+                # The window went away (e.g. the applet re-created its
+                # frame); drop the cached ID and look it up again.
+                self._invalidate_java_window()
                 return
 
+            # Cheap metadata checks first: transient frames right after
+            # the window appears are tiny and not worth copying out.
             w = CGImageGetWidth(cg_image)
             h = CGImageGetHeight(cg_image)
+            if w < 10 or h < 10:
+                return
             bpr = CGImageGetBytesPerRow(cg_image)
-            bpp = CGImageGetBitsPerPixel(cg_image)
-            alpha = CGImageGetAlphaInfo(cg_image)
 
-            if not hasattr(self, '_capture_count'):
-                self._capture_count = 0
-            self._capture_count += 1
-            if self._capture_count <= 3 or self._capture_count % 60 == 0:
-                print(f"[Coconut] Capture #{self._capture_count}: "
-                      f"{w}x{h} bpr={bpr} bpp={bpp} alpha={alpha}",
-                      flush=True)
+            data = CGDataProviderCopyData(CGImageGetDataProvider(cg_image))
+            if not data or len(data) < bpr * h:
+                return
 
-            if w < 10 or h < 10:
+            # Window images are BGRA in memory, which is exactly Qt's
+            # RGB32 layout on little-endian -- wrap the buffer as-is.
+            # The QImage does not own the bytes, so the CFData travels
+            # with it and the widget keeps it alive while on screen.
+            img = QImage(data, w, h, bpr, QImage.Format_RGB32)
+            self.frameReady.emit(img, data)
+        except Exception as e:
+            log.warning("Capture error: %s", e)
+
+
+class KvmViewerWidget(QWidget):
+    """Captures the Java applet window via macOS Quartz and forwards
+    keyboard/mouse events through the subprocess pipes.
+
+    Frames are pushed by ScreenCaptureKit (macOS 12.3+) when the window
+    changes; without it, a CaptureWorker polls CGWindowListCreateImage
+    on a background thread instead.
+    """
+
+    disconnected = pyqtSignal()
+    # (frame, dirty rect in frame pixels or None for "everything")
+    frameReady = pyqtSignal(QImage, object)
+
+    # Window over which mouse moves are coalesced into one pipe write.
+    _MOVE_MS = 8
+
+    _CONNECT_BG = QColor("#1e1e2e")
+    _CONNECT_FG = QColor("#e2e2f0")
+    _CONNECT_FONT = None
+
+    def __init__(self, proc, parent=None):
+        super().__init__(parent)
+        self._proc = proc
+        # Events are a few bytes each and well under PIPE_BUF, so write
+        # them straight to the fd: one syscall per event, no flush().
+        self._pipe = (os.fdopen(proc.stdin.fileno(), 'wb', buffering=0,
+                                closefd=False)
+                      if proc.stdin else None)
+        self._current_frame = None
+        self._current_pixmap = None
+        self._sx = self._sy = 1.0
+        self._last_cfdata = None
+        self._scroll_lock_time = 0.0
+        self._alive = True
+        self._java_wid = None
+        self._frame_w = 1024
+        self._frame_h = 768
+        self._stream = None
+        self._stream_output = None
+        self._streaming = False
+
+        self.setFocusPolicy(Qt.StrongFocus)
+        self.setMouseTracking(True)
+        self.setCursor(Qt.BlankCursor)
+        # paintEvent always covers the whole widget, so skip the erase.
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.setAttribute(Qt.WA_NoSystemBackground)
+
+        self.disconnected.connect(self._on_disconnect)
+        self.frameReady.connect(self._on_new_frame)
+
+        self._capture_thread = QThread(self)
+        self._capture_worker = CaptureWorker(proc.pid)
+        self._capture_worker.moveToThread(self._capture_thread)
+        self._capture_worker.frameReady.connect(
+            self._on_polled_frame, Qt.QueuedConnection)
+        self._capture_worker.windowFound.connect(self._on_window_found)
+        self._capture_worker.windowLost.connect(self._on_window_lost)
+        self._capture_thread.started.connect(self._capture_worker.start)
+        self._capture_thread.finished.connect(
+            self._capture_worker.deleteLater)
+        self._capture_thread.start()
+
+        self._pending_move = None
+        self._move_timer = QTimer(self)
+        self._move_timer.setSingleShot(True)
+        self._move_timer.setInterval(self._MOVE_MS)
+        self._move_timer.timeout.connect(self._flush_move)
+
+        # The child's stdout hits EOF when it exits, so watch that fd
+        # rather than waking up to poll() the process.
+        self._notifier = None
+        if proc.stdout:
+            self._notifier = QSocketNotifier(
+                proc.stdout.fileno(), QSocketNotifier.Read, self)
+            self._notifier.activated.connect(self._on_child_readable)
+
+    def _on_window_found(self, wid, w, h):
+        self._java_wid = wid
+        self._frame_w = w
+        self._frame_h = h
+        self._start_push_capture(wid)
+
+    def _on_window_lost(self):
+        self._java_wid = None
+        self._stop_push_capture()
+
+    def _stop_polling(self):
+        if self._capture_thread.isRunning():
+            QMetaObject.invokeMethod(
+                self._capture_worker, "stop", Qt.QueuedConnection)
+
+    def _start_push_capture(self, wid):
+        """Ask ScreenCaptureKit to stream window *wid* to ``frameReady``.
+
+        Returns False when ScreenCaptureKit is unavailable; polling then
+        carries on.  Polling also continues until the stream has started.
+        """
+        try:
+            import ScreenCaptureKit as SCK
+            from CoreMedia import CMTimeMake
+            from Quartz import kCVPixelFormatType_32BGRA
+            from dispatch import dispatch_queue_create
+        except ImportError:
+            return False
+
+        def on_started(error):
+            if error is not None:
+                log.warning("SCStream start failed: %s", error)
                 return
+            self._streaming = True
+            self._stop_polling()
+            log.info("ScreenCaptureKit stream active")
 
-            provider = CGImageGetDataProvider(cg_image)
-            data = CGDataProviderCopyData(provider)
-
-            if self._capture_count <= 3:
-                sample = bytes(data[:16]) if data else b''
-                print(f"[Coconut] First 16 bytes: {sample.hex()}",
-                      flush=True)
-
-            img = QImage(data, w, h, bpr, QImage.Format_ARGB32_Premultiplied)
-            if self._capture_count <= 3:
-                print(f"[Coconut] QImage null={img.isNull()} "
-                      f"size={img.width()}x{img.height()}",
-                      flush=True)
-            img = img.rgbSwapped()
-            self._current_frame = img.copy()
-            self._frame_w = w
-            self._frame_h = h
-            self.update()
+        def on_content(content, error):
+            if error is not None or content is None:
+                log.warning("SCShareableContent error: %s", error)
+                return
+            window = next((w for w in content.windows()
+                           if w.windowID() == wid), None)
+            if window is None:
+                log.warning("Window %s not shareable", wid)
+                return
+            flt = SCK.SCContentFilter.alloc().initWithDesktopIndependentWindow_(
+                window)
+            cfg = SCK.SCStreamConfiguration.alloc().init()
+            cfg.setWidth_(self._frame_w)
+            cfg.setHeight_(self._frame_h)
+            cfg.setPixelFormat_(kCVPixelFormatType_32BGRA)
+            cfg.setMinimumFrameInterval_(CMTimeMake(1, 30))
+            cfg.setShowsCursor_(False)
+            stream = SCK.SCStream.alloc().initWithFilter_configuration_delegate_(
+                flt, cfg, None)
+            output = _sck_output_class().alloc().initWithCallback_(
+                self._on_sample_buffer)
+            queue = dispatch_queue_create(b"coconut.kvm.capture", None)
+            ok, err = stream.addStreamOutput_type_sampleHandlerQueue_error_(
+                output, SCK.SCStreamOutputTypeScreen, queue, None)
+            if not ok:
+                log.warning("SCStream output error: %s", err)
+                return
+            self._stream = stream
+            self._stream_output = output
+            stream.startCaptureWithCompletionHandler_(on_started)
+
+        SCK.SCShareableContent.getShareableContentWithCompletionHandler_(
+            on_content)
+        return True
+
+    def _stop_push_capture(self):
+        stream, self._stream = self._stream, None
+        self._streaming = False
+        if stream is not None:
+            try:
+                stream.stopCaptureWithCompletionHandler_(None)
+            except Exception as e:
+                log.warning("SCStream stop error: %s", e)
+
+    def _on_sample_buffer(self, sample_buffer):
+        # Runs on the capture dispatch queue; frameReady is delivered to
+        # the GUI thread as a queued connection.
+        if not self._alive:
+            return
+        try:
+            img = _sample_buffer_to_qimage(sample_buffer)
+            if img is None:
+                return
+            dirty = _sample_buffer_dirty_rect(sample_buffer)
         except Exception as e:
-            print(f"[Coconut] Capture error: {e}", flush=True)
+            log.warning("Stream frame error: %s", e)
+            return
+        self.frameReady.emit(img, dirty)
 
-    def _check_proc(self):
-        if self._proc.poll() is not None and self._alive:
+    def _on_polled_frame(self, img, data):
+        if not self._alive or self._streaming:
+            return
+        self._last_cfdata = data
+        self._on_new_frame(img)
+
+    def _on_new_frame(self, img, dirty=None):
+        full = (self._current_frame is None
+                or (img.width(), img.height()) != (self._frame_w, self._frame_h))
+        self._current_frame = img
+        self._frame_w = img.width()
+        self._frame_h = img.height()
+        self._rescale_frame()
+        if dirty is None or full:
+            self.update()
+            return
+        # Repaint only the part of the widget the applet actually changed;
+        # a mostly static console then costs a few small blits per frame.
+        x, y, w, h = dirty
+        self.update(QRect(int(x / self._sx), int(y / self._sy),
+                          int(w / self._sx) + 2, int(h / self._sy) + 2))
+
+    def _rescale_frame(self):
+        """Scale the current frame to the widget once, so paints are 1:1."""
+        img = self._current_frame
+        if img is None or img.isNull():
+            self._current_pixmap = None
+            self._sx = self._sy = 1.0
+            return
+        # Widget -> frame scale for mouse events, refreshed here so the
+        # hot mouse-move path is two multiplies.
+        self._sx = img.width() / max(self.width(), 1)
+        self._sy = img.height() / max(self.height(), 1)
+        dpr = self.devicePixelRatioF()
+        target = self.size() * dpr
+        if img.size() != target:
+            img = img.scaled(target, Qt.IgnoreAspectRatio,
+                             Qt.FastTransformation)
+        pm = QPixmap.fromImage(img)
+        pm.setDevicePixelRatio(dpr)
+        self._current_pixmap = pm
+
+    def _on_child_readable(self, *_):
+        try:
+            chunk = os.read(self._proc.stdout.fileno(), 4096)
+        except OSError:
+            chunk = b''
+        if not chunk and self._alive:
             self._on_disconnect()
 
     def _on_disconnect(self):
         self._alive = False
-        self._capture_timer.stop()
-        self._poll_timer.stop()
+        self._capture_thread.quit()
+        if self._notifier is not None:
+            self._notifier.setEnabled(False)
+        self._stop_push_capture()
         try:
             parent = self.parent()
             if parent and hasattr(parent, '_on_kvm_disconnect'):
@@ -1004,51 +1540,66 @@ class KvmViewerWidget(QWidget):
             pass
 
     def paintEvent(self, event):
-        if self._current_frame and not self._current_frame.isNull():
-            p = QPainter(self)
-            p.setRenderHint(QPainter.SmoothPixmapTransform, False)
-            p.drawImage(self.rect(), self._current_frame)
-            p.end()
-        else:
-            p = QPainter(self)
-            p.fillRect(self.rect(), QColor("#1e1e2e"))
-            p.setPen(QColor("#e2e2f0"))
-            p.setFont(QFont("sans-serif", 20))
-            p.drawText(self.rect(), Qt.AlignCenter, "Connecting to KVM…")
-            p.end()
+        pm = self._current_pixmap
+        if pm is not None:
+            r = QRectF(event.rect())
+            dpr = pm.devicePixelRatio()
+            QPainter(self).drawPixmap(
+                r, pm, QRectF(r.x() * dpr, r.y() * dpr,
+                              r.width() * dpr, r.height() * dpr))
+            return
+        cls = type(self)
+        if cls._CONNECT_FONT is None:
+            # Built on first paint: QFont needs a QGuiApplication.
+            cls._CONNECT_FONT = QFont("sans-serif", 20)
+        p = QPainter(self)
+        p.fillRect(self.rect(), self._CONNECT_BG)
+        p.setPen(self._CONNECT_FG)
+        p.setFont(self._CONNECT_FONT)
+        p.drawText(self.rect(), Qt.AlignCenter, "Connecting to KVM…")
+        p.end()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._rescale_frame()
 
     # ── Mouse events ──────────────────────────────────────────────────
 
     def _scale_pos(self, event):
-        if not self._current_frame or self._current_frame.isNull():
-            return event.x(), event.y()
-        sx = self._current_frame.width() / max(self.width(), 1)
-        sy = self._current_frame.height() / max(self.height(), 1)
-        return int(event.x() * sx), int(event.y() * sy)
+        return int(event.x() * self._sx), int(event.y() * self._sy)
 
     def _btn_mask(self, event):
-        b = 0
-        btns = event.buttons()
-        if btns & Qt.LeftButton:   b |= 1
-        if btns & Qt.RightButton:  b |= 2
-        if btns & Qt.MiddleButton: b |= 4
-        return b
+        # Qt.LeftButton/RightButton/MiddleButton are already 1/2/4.
+        return int(event.buttons()) & 7
 
     def mouseMoveEvent(self, event):
+        # Only the latest position matters to the applet, so moves and
+        # drags are coalesced and written at most once per _MOVE_MS.
         x, y = self._scale_pos(event)
         if event.buttons():
-            self._send_event(b'D', struct.pack('>HHB', x, y, self._btn_mask(event)))
+            self._pending_move = (b'D', x, y, self._btn_mask(event))
         else:
-            self._send_event(b'M', struct.pack('>HHB', x, y, 0))
+            self._pending_move = (b'M', x, y, 0)
+        if not self._move_timer.isActive():
+            self._move_timer.start()
+
+    def _flush_move(self):
+        move, self._pending_move = self._pending_move, None
+        self._move_timer.stop()
+        if move is not None:
+            tag, x, y, mask = move
+            self._send_event(tag, _MOUSE_PACK(x, y, mask))
 
     def mousePressEvent(self, event):
         self.setFocus()
+        self._flush_move()
         x, y = self._scale_pos(event)
-        self._send_event(b'P', struct.pack('>HHB', x, y, self._btn_mask(event)))
+        self._send_event(b'P', _MOUSE_PACK(x, y, self._btn_mask(event)))
 
     def mouseReleaseEvent(self, event):
+        self._flush_move()
         x, y = self._scale_pos(event)
-        self._send_event(b'L', struct.pack('>HHB', x, y, self._btn_mask(event)))
+        self._send_event(b'L', _MOUSE_PACK(x, y, self._btn_mask(event)))
 
     # ── Keyboard events ──────────────────────────────────────────────
 
@@ -1067,37 +1618,35 @@ class KvmViewerWidget(QWidget):
         self._send_key(event, pressed=False)
 
     def _send_key(self, event, pressed):
-        java_key = _QT_TO_JAVA_KEY.get(event.key())
+        # Printable ASCII is the common case and maps to itself.
+        k = event.key()
+        java_key = k if 0x20 <= k <= 0x7E else _QT_TO_JAVA_KEY.get(k)
         if java_key is None:
-            k = event.key()
-            if 0x20 <= k <= 0x7E:
-                java_key = k
-            else:
-                return
-        mods = 0
-        m = event.modifiers()
-        if m & Qt.ShiftModifier:   mods |= 1
-        if m & Qt.ControlModifier: mods |= 2
-        if m & Qt.AltModifier:     mods |= 4
-        if m & Qt.MetaModifier:    mods |= 8
-        self._send_event(b'K', struct.pack('>iBB', java_key, 1 if pressed else 0, mods))
+            return
+        # Qt's Shift/Control/Alt/Meta modifier bits are 1 << 25..28, in the
+        # same order as the launcher's 1/2/4/8 mask.
+        mods = (int(event.modifiers()) >> 25) & 0xF
+        self._send_event(b'K', _KEY_PACK(java_key, 1 if pressed else 0, mods))
 
     # ── Send / disconnect ────────────────────────────────────────────
 
     def _send_event(self, tag, data):
-        if not self._alive or not self._proc or self._proc.poll() is not None:
+        if not self._alive or not self._pipe:
+            return
+        if self._proc.poll() is not None:
+            # Only reached when there is no stdout pipe to watch.
+            self._on_disconnect()
             return
         try:
-            self._proc.stdin.write(tag + data)
-            self._proc.stdin.flush()
+            self._pipe.write(tag + data)
         except Exception:
             pass
 
     def _disconnect(self):
         self._alive = False
         try:
-            self._proc.stdin.write(b'Q')
-            self._proc.stdin.flush()
+            if self._pipe:
+                self._pipe.write(b'Q')
         except Exception:
             pass
         try:
@@ -1107,6 +1656,9 @@ class KvmViewerWidget(QWidget):
 
     def cleanup(self):
         self._alive = False
+        self._stop_push_capture()
+        self._capture_thread.quit()
+        self._capture_thread.wait(1000)
         try:
             self._proc.terminate()
         except Exception:
@@ -1115,16 +1667,30 @@ class KvmViewerWidget(QWidget):
 
 # ── TLS Proxy (integrated) ───────────────────────────────────────────────────
 
+_LAN_IP_TTL = 60.0
+_lan_ip_cache = (None, 0.0)
+
+
 def _get_lan_ip():
-    """Get this machine's LAN IP address."""
+    """Get this machine's LAN IP address.
+
+    The routing lookup is cached for ``_LAN_IP_TTL`` seconds, since
+    ``ProxyManager.url`` may be read several times per status refresh.
+    """
+    global _lan_ip_cache
+    ip, ts = _lan_ip_cache
+    now = time.monotonic()
+    if ip is not None and now - ts < _LAN_IP_TTL:
+        return ip
     try:
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         s.connect(("8.8.8.8", 80))
         ip = s.getsockname()[0]
         s.close()
-        return ip
     except Exception:
-        return "127.0.0.1"
+        ip = "127.0.0.1"
+    _lan_ip_cache = (ip, now)
+    return ip
 
 
 class ProxyManager:
@@ -1172,13 +1738,12 @@ class ProxyManager:
             self._thread.start()
             self._external = False
             self.running = True
-            print(f"[Coconut] TLS Proxy started on {self.url}", flush=True)
+            log.info("TLS Proxy started on %s", self.url)
 
         except OSError as e:
             if "already in use" in str(e).lower():
-                print(f"[Coconut] Port {self._listen_port} already in use "
-                      f"(systemd service is running) — proxy ON externally",
-                      flush=True)
+                log.info("Port %s already in use (systemd service is running) "
+                         "— proxy ON externally", self._listen_port)
                 self._external = True
                 self.running = True
             else:
@@ -1188,7 +1753,7 @@ class ProxyManager:
         if not self.running:
             return
         if getattr(self, '_external', False):
-            print("[Coconut] Proxy is managed by systemd — not stopping", flush=True)
+            log.info("Proxy is managed by systemd — not stopping")
             self.running = False
             self._external = False
             return
@@ -1196,11 +1761,471 @@ class ProxyManager:
             self._server.shutdown()
             self._server.server_close()
         except Exception as e:
-            print(f"[Coconut] Proxy stop error: {e}", flush=True)
+            log.warning("Proxy stop error: %s", e)
         self._server = None
         self._thread = None
         self.running = False
-        print("[Coconut] TLS Proxy stopped", flush=True)
+        log.info("TLS Proxy stopped")
+
+
+class _ProxySignals(QObject):
+    done = pyqtSignal(bool, str)   # ok, error message
+
+
+class ProxyTask(QRunnable):
+    """Runs a ProxyManager start()/stop() on the global thread pool.
+
+    Binding the socket, loading certs and shutting the server down all
+    block, so they stay off the GUI thread; ``signals.done`` is delivered
+    back to the window queued.
+    """
+
+    def __init__(self, action):
+        super().__init__()
+        self._action = action
+        self.signals = _ProxySignals()
+
+    def run(self):
+        try:
+            self._action()
+        except Exception as e:
+            log.exception("Proxy task failed: %s", e)
+            self.signals.done.emit(False, str(e))
+        else:
+            self.signals.done.emit(True, "")
+
+
+# ── Applet JAR cache ────────────────────────────────────────────────────────
+# Seconds: the network budget for fetching one JAR (all retries).
+_CONNECT_DEADLINE = 15.0
+# Launch requests the launcher JVM hasn't acknowledged yet; further
+# connect clicks are refused past this many.
+_MAX_INFLIGHT_CONNECTS = 2
+# Prefix of the line the launcher JVM prints on stdout once per launch
+# request, followed by "ok" or "failed <error>" (see runDaemon).
+_LAUNCH_ACK = b"@@coconut:launch "
+
+
+class _LauncherSignals(QObject):
+    launched = pyqtSignal(int, bool, str)   # JVM PID, ok, error message
+    exited = pyqtSignal(int)                # JVM PID
+    prefetched = pyqtSignal(object, object) # java path or None, _LauncherPrep
+
+
+def _relay_launcher_output(proc, signals):
+    """Echo a launcher JVM's stdout, turning launch acks into signals.
+
+    Runs on a daemon thread per JVM until it exits; the applet's own
+    output is passed through to our stdout as before.
+    """
+    out = getattr(sys.stdout, "buffer", None)
+    for line in io.BufferedReader(proc.stdout):
+        i = line.find(_LAUNCH_ACK)
+        if i < 0:
+            if out is not None:
+                out.write(line)
+                out.flush()
+            continue
+        if i and out is not None:
+            out.write(line[:i] + b"\n")
+        status = line[i + len(_LAUNCH_ACK):].decode("utf-8", "replace").strip()
+        signals.launched.emit(proc.pid, status == "ok",
+                              status.removeprefix("failed").strip())
+    signals.exited.emit(proc.pid)
+
+
+_JAR_DIR = os.path.join(os.path.expanduser("~"), ".coconut", "jars")
+_JAR_NAMES = (
+    "rc.jar", "rclang_en.jar", "rclang_zhs.jar",
+    "rclang_zht.jar", "rclang_ja.jar",
+)
+
+
+class _LauncherError(Exception):
+    """Preparing the KVM launcher failed; carries the dialog to show."""
+
+    def __init__(self, title, message, critical=False):
+        super().__init__(message)
+        self.title = title
+        self.message = message
+        self.critical = critical
+
+
+class JarCache:
+    """ETag/Last-Modified validators for downloaded JARs, keyed by URL.
+
+    Lives next to the JARs as ``cache.sqlite`` so a later connect can
+    revalidate with a conditional GET instead of trusting the file forever.
+    """
+
+    def __init__(self, path):
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jars (url TEXT PRIMARY KEY, "
+            "etag TEXT, last_modified TEXT, sha256 TEXT)")
+
+    def get(self, url):
+        """Return ``(etag, last_modified)`` for *url*, or None if unknown."""
+        return self._db.execute(
+            "SELECT etag, last_modified FROM jars WHERE url = ?",
+            (url,)).fetchone()
+
+    def digest(self, url):
+        """The sha256 recorded when *url* was last downloaded, or None."""
+        row = self._db.execute(
+            "SELECT sha256 FROM jars WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, url, etag, last_modified, sha256):
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO jars VALUES (?, ?, ?, ?)",
+                (url, etag, last_modified, sha256))
+
+    def close(self):
+        self._db.close()
+
+
+_JAVA_HOME_TOOL = "/usr/libexec/java_home"
+
+
+@functools.lru_cache(maxsize=None)
+def _jar_ssl_context():
+    """Permissive client context for the device's legacy HTTPS stack.
+
+    Built once and shared, so cipher parsing happens once and repeat
+    connects can resume TLS sessions from its cache.
+    """
+    ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    ctx.check_hostname = False
+    ctx.verify_mode = ssl.CERT_NONE
+    ctx.options &= ~ssl.OP_NO_TLSv1
+    try:
+        ctx.minimum_version = ssl.TLSVersion.TLSv1
+    except (ValueError, ssl.SSLError):
+        pass
+    try:
+        ctx.set_ciphers("DEFAULT:@SECLEVEL=0")
+    except ssl.SSLError:
+        ctx.set_ciphers("ALL")
+    return ctx
+
+
+@functools.lru_cache(maxsize=None)
+def _jar_opener():
+    return urllib.request.build_opener(
+        urllib.request.HTTPSHandler(context=_jar_ssl_context()))
+
+
+@functools.lru_cache(maxsize=None)
+def _find_javac(java):
+    """The javac that belongs to *java* (or any on PATH), else None."""
+    javac = java.replace("/bin/java", "/bin/javac")
+    if os.path.isfile(javac):
+        return javac
+    return shutil.which("javac")
+
+
+def _download_jar(opener, url, dst, etag=None, last_modified=None,
+                  timeout=_CONNECT_DEADLINE):
+    """Fetch *url* into *dst* unless the validators say it is unchanged.
+
+    Returns None on 304 Not Modified, otherwise
+    ``(size, etag, last_modified, sha256)`` for the new file.  The body is
+    streamed to a temp file next to *dst* and hashed on the way through,
+    fsynced, and only then renamed over *dst*, so a killed or failed
+    download never leaves a truncated JAR that passes the cache check.
+    """
+    req = urllib.request.Request(url)
+    if etag:
+        req.add_header("If-None-Match", etag)
+    if last_modified:
+        req.add_header("If-Modified-Since", last_modified)
+    try:
+        resp = opener.open(req, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None
+        raise
+    digest = hashlib.sha256()
+    size = 0
+    tmp = tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(dst), prefix=".jar-", delete=False)
+    try:
+        with resp, tmp:
+            while True:
+                chunk = resp.read(1 << 20)
+                if not chunk:
+                    break
+                tmp.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.replace(tmp.name, dst)
+    except BaseException:
+        try:
+            os.unlink(tmp.name)
+        except OSError:
+            pass
+        raise
+    return (size, resp.headers.get("ETag"),
+            resp.headers.get("Last-Modified"), digest.hexdigest())
+
+
+def _is_transient(exc):
+    """True for network failures worth retrying (never for 4xx replies)."""
+    if isinstance(exc, urllib.error.HTTPError):
+        return exc.code >= 500
+    return isinstance(exc, (urllib.error.URLError, ssl.SSLError,
+                            socket.timeout, ConnectionError))
+
+
+def _download_with_retry(opener, url, dst, etag=None, last_modified=None,
+                         attempts=4, base=0.4):
+    """``_download_jar`` with exponential backoff and full jitter.
+
+    Embedded Raritan TLS stacks drop the odd handshake; only transient
+    errors are retried, anything else is raised straight away.  All
+    attempts share one _CONNECT_DEADLINE, so an unreachable device fails
+    in bounded time instead of once per attempt.
+    """
+    deadline = time.monotonic() + _CONNECT_DEADLINE
+    for i in range(attempts):
+        remaining = deadline - time.monotonic()
+        try:
+            return _download_jar(opener, url, dst, etag, last_modified,
+                                 timeout=max(remaining, 1.0))
+        except Exception as e:
+            if i == attempts - 1 or not _is_transient(e):
+                raise
+            delay = random.uniform(0, base * 2 ** i)
+            if time.monotonic() + delay >= deadline:
+                raise
+            log.info("%s: %s — retrying in %.1fs", url, e, delay)
+            time.sleep(delay)
+
+
+class _LauncherPrep:
+    """Applet JARs and compiled launcher, plus what is known about them.
+
+    One instance is owned by whichever thread is preparing: the start-up
+    prefetch builds its own on a worker thread and hands it to the GUI
+    thread when done, so the two never share this state.
+    """
+
+    def __init__(self):
+        self._jars_synced_host = None
+        self._jar_entries: dict[str, os.stat_result] | None = None
+        self._launcher_src_hash = None
+        self._launcher_verified = None
+
+    def prepare(self, java, host):
+        """Make sure the applet JARs and the compiled launcher exist.
+
+        Returns ``(jar_dir, jar_paths, updated)`` where *updated* says a JAR
+        or the launcher class changed on disk.  JARs are revalidated
+        against a given host once per session.  Touches no widgets; raises
+        _LauncherError for the caller to show.
+        """
+        javac = _find_javac(java)
+
+        jar_dir = _JAR_DIR
+        entries = self._jar_dir_entries()
+        updated = False
+
+        # ── Download JARs from the Raritan device (cached) ──────────
+        if self._jars_synced_host != host:
+            # Fetch or revalidate every JAR concurrently: they come from
+            # the same device, so the wall time is the slowest single
+            # request rather than the sum of five handshakes and
+            # transfers.  Cached JARs are revalidated with a conditional
+            # GET (304 = keep); ones the device sent no validators for
+            # are trusted as before.
+            cache = JarCache(os.path.join(jar_dir, "cache.sqlite"))
+            try:
+                jobs = {}
+                for n in _JAR_NAMES:
+                    jp = os.path.join(jar_dir, n)
+                    url = f"https://{host}/{n}"
+                    validators = cache.get(url) if n in entries else None
+                    if validators == (None, None):
+                        continue
+                    jobs[n] = (url, jp, *(validators or (None, None)))
+                if jobs:
+                    updated = self._fetch_jars(_jar_opener(), host, jobs,
+                                               cache)
+            finally:
+                cache.close()
+            self._jars_synced_host = host
+            if updated:
+                self._jar_entries = None
+                entries = self._jar_dir_entries()
+
+        jar_paths = [os.path.join(jar_dir, n) for n in _JAR_NAMES
+                     if n in entries]
+
+        # ── Compile launcher if needed ──────────────────────────────
+        launcher_src = os.path.join(os.path.dirname(__file__),
+                                    "CoconutAppletLauncher.java")
+        launcher_cls = os.path.join(jar_dir, "CoconutAppletLauncher.class")
+
+        if not self._launcher_is_current(javac, jar_dir, launcher_src,
+                                         launcher_cls):
+            if not javac:
+                raise _LauncherError(
+                    "javac Not Found",
+                    "Need javac to compile the applet launcher.\n"
+                    "Install a full JDK (not just JRE).",
+                )
+            log.info("Compiling CoconutAppletLauncher…")
+            r = subprocess.run(
+                [javac, "-source", "11", "-target", "11",
+                 "-d", jar_dir, launcher_src],
+                capture_output=True, text=True,
+            )
+            if r.returncode != 0:
+                log.error("javac failed: %s", r.stderr)
+                raise _LauncherError("Compile Failed", r.stderr, critical=True)
+            log.info("Compilation OK")
+            with open(os.path.join(jar_dir, "launcher.stamp"), "w") as f:
+                f.write(self._launcher_stamp_for(javac))
+            self._launcher_verified = self._launcher_stamp_for(javac)
+            self._jar_entries = None
+            updated = True
+
+        return jar_dir, jar_paths, updated
+
+    def _fetch_jars(self, opener, host, jobs, cache):
+        """Run the JAR *jobs* ``{name: (url, path, etag, last_modified)}``.
+
+        Returns True if any JAR on disk was replaced.  Raises
+        _LauncherError if rc.jar is neither fetched nor cached; language
+        packs are best-effort.
+        """
+        updated = False
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=len(jobs)) as pool:
+            futures = {pool.submit(_download_with_retry, opener, *job): n
+                       for n, job in jobs.items()}
+            for fut in concurrent.futures.as_completed(futures):
+                jar_name = futures[fut]
+                url, jp = jobs[jar_name][:2]
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    if self._cached_jar_intact(cache, url, jp):
+                        log.warning("Could not revalidate %s: %s — using cached copy",
+                                    jar_name, e)
+                        continue
+                    log.error("Could not download %s: %s", jar_name, e)
+                    if jar_name == "rc.jar":
+                        raise _LauncherError(
+                            "Download Failed",
+                            f"Could not download {jar_name} from {host}:\n{e}",
+                        ) from e
+                    continue
+                if result is None:
+                    log.info("%s unchanged", jar_name)
+                    continue
+                size, etag, last_modified, sha256 = result
+                cache.put(url, etag, last_modified, sha256)
+                updated = True
+                log.info("Downloaded %s (%d bytes)", jar_name, size)
+        return updated
+
+    def _cached_jar_intact(self, cache, url, path):
+        """True if *path* is the complete download JarCache recorded.
+
+        Only consulted when revalidation failed, so hashing the file here
+        costs nothing on the normal path; a partial or replaced file is
+        not trusted just because it exists.
+        """
+        expected = cache.digest(url)
+        if not expected or os.path.basename(path) not in self._jar_dir_entries():
+            return False
+        digest = hashlib.sha256()
+        try:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        except OSError:
+            return False
+        return digest.hexdigest() == expected
+
+    def _jar_dir_entries(self):
+        """``{name: stat}`` for the JAR directory, from one scandir().
+
+        Kept for the session so warm connects make their cache decisions
+        from a dict instead of a makedirs/exists/stat per file; reset to
+        None whenever a download or compile changes the directory.
+        """
+        if self._jar_entries is None:
+            os.makedirs(_JAR_DIR, exist_ok=True)
+            with os.scandir(_JAR_DIR) as it:
+                self._jar_entries = {e.name: e.stat() for e in it}
+        return self._jar_entries
+
+    def _launcher_stamp_for(self, javac):
+        """``<sha256 of the launcher source>:<real javac path>``."""
+        return f"{self._launcher_src_hash}:{os.path.realpath(javac)}"
+
+    def _launcher_is_current(self, javac, jar_dir, launcher_src, launcher_cls):
+        """True if the compiled launcher matches the source and javac.
+
+        Compared by content hash rather than mtime, so a checkout or an
+        editor save that doesn't change the source doesn't trigger javac.
+        The hash is computed once per session and a verified stamp is
+        remembered, so later connects skip this I/O entirely.
+        """
+        if self._launcher_src_hash is None:
+            try:
+                with open(launcher_src, "rb") as f:
+                    self._launcher_src_hash = hashlib.sha256(
+                        f.read()).hexdigest()
+            except OSError:
+                # No source to rebuild from: any compiled class will do.
+                return os.path.basename(launcher_cls) in self._jar_dir_entries()
+        if javac and self._launcher_verified == self._launcher_stamp_for(javac):
+            return True
+        if os.path.basename(launcher_cls) not in self._jar_dir_entries():
+            return False
+        try:
+            with open(os.path.join(jar_dir, "launcher.stamp")) as f:
+                stamp = f.read().strip()
+        except OSError:
+            return False
+        if not javac:
+            # Can't rebuild anyway; accept a class built from this source.
+            return stamp.startswith(self._launcher_src_hash + ":")
+        if stamp != self._launcher_stamp_for(javac):
+            return False
+        self._launcher_verified = stamp
+        return True
+
+
+def _prefetch_launcher(host, signals):
+    """Background warm-up: fetch the JARs and build the launcher.
+
+    Runs on a worker thread at start-up so the first connect doesn't pay
+    for downloads and javac.  Works on its own _LauncherPrep and hands it,
+    with the Java binary it found, to the GUI thread through
+    ``signals.prefetched``.  Failures are only logged here; the connect
+    retries and reports them.
+    """
+    prep = _LauncherPrep()
+    java = None
+    try:
+        java = BrowserWindow._probe_java()
+        if java:
+            prep.prepare(java, host)
+            log.info("Applet launcher ready")
+    except _LauncherError as e:
+        log.warning("Launcher prefetch: %s", e.message)
+    except Exception as e:
+        log.warning("Launcher prefetch failed: %s", e)
+    finally:
+        signals.prefetched.emit(java, prep)
 
 
 # ── Main window ─────────────────────────────────────────────────────────────
@@ -1213,9 +2238,32 @@ class BrowserWindow(QMainWindow):
         self.resize(1280, 820)
 
         self.bookmarks: list[tuple[str, str]] = []
-        self.history_urls: list[str] = []
+        self._bookmark_urls: set[str] = set()
+        self._java_daemon: subprocess.Popen | None = None
+        self._java_daemon_cmd = None
+        self._java_path = None
+        # Only touched on the GUI thread; the prefetch hands over its own.
+        self._launcher_prep = _LauncherPrep()
+        self._prefetching = False
+        self._pending_connect = None
+        # Unacknowledged launch requests per launcher JVM PID.
+        self._pending_launches: dict[int, int] = {}
+        self._launcher_signals = _LauncherSignals()
+        self._launcher_signals.launched.connect(self._on_launch_acked)
+        self._launcher_signals.exited.connect(self._on_launcher_exited)
+        self._launcher_signals.prefetched.connect(self._on_prefetched)
+        self._launch_key = None
+        self._cached_launch_prefix: list[str] | None = None
+        # Insertion-ordered set of visited URLs, oldest first.
+        self.history_urls: collections.OrderedDict[str, None] = \
+            collections.OrderedDict()
         self.settings_store = QSettings("Coconut", "Coconut")
         self._load_bookmarks()
+        # Coalesce bursts of bookmark edits into one QSettings write.
+        self._bookmark_save_timer = QTimer(self)
+        self._bookmark_save_timer.setSingleShot(True)
+        self._bookmark_save_timer.setInterval(500)
+        self._bookmark_save_timer.timeout.connect(self._write_bookmarks)
 
         # Dedicated profile with its own storage — avoids SQLite cookie
         # lock conflicts with any other QtWebEngine instance.
@@ -1236,6 +2284,8 @@ class BrowserWindow(QMainWindow):
 
         target_host = QUrl(self.HOME_URL).host()
         self._proxy = ProxyManager(target_host=target_host)
+        self._proxy_task: ProxyTask | None = None
+        self._proxy_interactive = False
 
         self._build_menu_bar()
         self._build_toolbar()
@@ -1246,6 +2296,16 @@ class BrowserWindow(QMainWindow):
 
         QTimer.singleShot(500, self._auto_start_proxy)
 
+        # Warm the applet JAR cache and compile the launcher in the
+        # background so the first KVM connect only waits for the JVM.
+        # A plain daemon thread rather than the Qt pool, so quitting
+        # during a slow download doesn't wait for it.
+        self._prefetching = True
+        threading.Thread(
+            target=_prefetch_launcher,
+            args=(target_host, self._launcher_signals),
+            name="coconut-launcher-prefetch", daemon=True).start()
+
     def _build_menu_bar(self):
         mb = self.menuBar()
 
@@ -1296,6 +2356,12 @@ class BrowserWindow(QMainWindow):
         completer.setCaseSensitivity(Qt.CaseInsensitive)
         completer.setMaxVisibleItems(8)
         self.url_bar.setCompleter(completer)
+        self._completer_timer = QTimer(self)
+        self._completer_timer.setSingleShot(True)
+        self._completer_timer.setInterval(200)
+        self._completer_timer.timeout.connect(
+            lambda: self._url_completer_model.setStringList(
+                list(self.history_urls)))
 
         tb.addWidget(self.url_bar)
 
@@ -1371,8 +2437,8 @@ class BrowserWindow(QMainWindow):
         idx = self.tabs.addTab(view, "New Tab")
         self.tabs.setCurrentIndex(idx)
 
-        view.titleChanged.connect(lambda t, v=view: self._update_tab_title(v, t))
-        view.urlChanged.connect(lambda u, v=view: self._update_url_bar(v, u))
+        view.titleChanged.connect(self._update_tab_title)
+        view.urlChanged.connect(self._update_url_bar)
         view.loadStarted.connect(self._on_load_started)
         view.loadProgress.connect(self._on_load_progress)
         view.loadFinished.connect(self._on_load_finished)
@@ -1426,7 +2492,10 @@ class BrowserWindow(QMainWindow):
         if v: v.setUrl(url)
 
     # ── Signals ─────────────────────────────────────────────────────────
-    def _update_tab_title(self, view, title):
+    # Tab signals are connected as bound methods (no per-tab closures);
+    # the emitting view is recovered with sender().
+    def _update_tab_title(self, title):
+        view = self.sender()
         idx = self.tabs.indexOf(view)
         if idx >= 0:
             short = (title[:28] + "…") if len(title) > 30 else title
@@ -1434,8 +2503,8 @@ class BrowserWindow(QMainWindow):
             if view == self._current_view():
                 self.setWindowTitle(f"{title} — Coconut")
 
-    def _update_url_bar(self, view, qurl):
-        if view == self._current_view():
+    def _update_url_bar(self, qurl):
+        if self.sender() == self._current_view():
             url_str = qurl.toString()
             self.url_bar.setText(url_str)
             self._record_history(url_str)
@@ -1473,11 +2542,17 @@ class BrowserWindow(QMainWindow):
             self.ssl_label.setStyleSheet("color: #f59e0b; font-weight: bold;")
 
     def _record_history(self, url_str):
-        if url_str and url_str not in self.history_urls:
-            self.history_urls.append(url_str)
-            if len(self.history_urls) > 500:
-                self.history_urls = self.history_urls[-500:]
-            self._url_completer_model.setStringList(self.history_urls)
+        if not url_str:
+            return
+        if url_str in self.history_urls:
+            # Recency only affects eviction; the completer list is
+            # unchanged, so don't rebuild its model.
+            self.history_urls.move_to_end(url_str)
+            return
+        self.history_urls[url_str] = None
+        if len(self.history_urls) > 500:
+            self.history_urls.popitem(last=False)
+        self._completer_timer.start()
 
     # ── Bookmarks ───────────────────────────────────────────────────────
     def _add_bookmark(self):
@@ -1485,11 +2560,11 @@ class BrowserWindow(QMainWindow):
         if not v: return
         title = v.page().title()
         url = v.url().toString()
-        for _, u in self.bookmarks:
-            if u == url:
-                self.status.showMessage("Already bookmarked", 2000)
-                return
+        if url in self._bookmark_urls:
+            self.status.showMessage("Already bookmarked", 2000)
+            return
         self.bookmarks.append((title, url))
+        self._bookmark_urls.add(url)
         self._save_bookmarks()
         self.status.showMessage(f"Bookmarked: {title}", 2000)
 
@@ -1498,15 +2573,23 @@ class BrowserWindow(QMainWindow):
         if dlg.exec_() == QDialog.Accepted and dlg.selected_url:
             v = self._current_view()
             if v: v.setUrl(QUrl(dlg.selected_url))
-        self._save_bookmarks()
+        urls = {u for _, u in self.bookmarks}
+        if urls != self._bookmark_urls:
+            self._bookmark_urls = urls
+            self._save_bookmarks()
 
     def _save_bookmarks(self):
+        self._bookmark_save_timer.start()
+
+    def _write_bookmarks(self):
+        self._bookmark_save_timer.stop()
         self.settings_store.setValue("bookmarks", list(self.bookmarks))
 
     def _load_bookmarks(self):
         saved = self.settings_store.value("bookmarks")
         if saved and isinstance(saved, list):
             self.bookmarks = saved
+        self._bookmark_urls = {u for _, u in self.bookmarks}
 
     # ── Downloads / JNLP ───────────────────────────────────────────────
     def _on_download(self, download: QWebEngineDownloadItem):
@@ -1549,13 +2632,53 @@ class BrowserWindow(QMainWindow):
 
     # ── KVM viewer launch ─────────────────────────────────────────────
     def _launch_kvm_viewer(self, params):
+        """Connect handler with a bulkhead on concurrent launches.
+
+        A launch is in flight from the moment its request is written to
+        the launcher JVM until that JVM reports the applet started (or
+        failed, or exits); past _MAX_INFLIGHT_CONNECTS further clicks are
+        refused with a status message instead of stacking applet sessions
+        on a device that isn't answering.
+        """
+        inflight = sum(self._pending_launches.values())
+        if inflight >= _MAX_INFLIGHT_CONNECTS:
+            log.info("Connect ignored: %d launches already in flight",
+                     inflight)
+            self.status.showMessage(
+                "KVM viewers are still starting — try again in a moment", 5000)
+            return
+        self._start_kvm_session(params)
+
+    def _on_launch_acked(self, pid, ok, error):
+        n = self._pending_launches.get(pid, 0)
+        if n > 1:
+            self._pending_launches[pid] = n - 1
+        else:
+            self._pending_launches.pop(pid, None)
+        if not ok:
+            log.warning("KVM viewer failed to start: %s", error)
+            self.status.showMessage(
+                f"KVM viewer failed to start: {error}", 8000)
+
+    def _on_launcher_exited(self, pid):
+        # Requests a dead JVM never answered are no longer in flight.
+        self._pending_launches.pop(pid, None)
+
+    def _on_prefetched(self, java, prep):
+        self._prefetching = False
+        self._launcher_prep = prep
+        if java and self._java_path is None:
+            self._java_path = java
+        params, self._pending_connect = self._pending_connect, None
+        if params is not None:
+            self._launch_kvm_viewer(params)
+
+    def _start_kvm_session(self, params):
         """Launch the Raritan KVM viewer via CoconutAppletLauncher.
 
         Uses a custom Java AppletStub/JFrame wrapper that provides the
         applet runtime environment the Raritan RemoteConsoleApplet expects.
         """
-        import json
-
         host = params.get("_connect_host", "10.1.10.36")
         port_index = params.get("_connect_pindex", "0")
         port_id = params.get("_connect_portId", "")
@@ -1563,8 +2686,16 @@ class BrowserWindow(QMainWindow):
         session_id = params.get("SESSION_ID", "")
         ssl_port = params.get("SSLPORT", "443")
 
-        print(f"[Coconut] KVM connect: host={host} port_index={port_index} "
-              f"port_id={port_id} name={port_name}", flush=True)
+        if self._prefetching:
+            # Connect once the prefetch hands its JARs/launcher over,
+            # rather than blocking the event loop on it.
+            self._pending_connect = params
+            self.status.showMessage(
+                f"Finishing applet download for {port_name}…")
+            return
+
+        log.info("KVM connect: host=%s port_index=%s port_id=%s name=%s",
+                 host, port_index, port_id, port_name)
 
         # ── Locate Java (prefer JDK 11 for Applet API support) ──────
         java = self._find_java()
@@ -1587,75 +2718,17 @@ class BrowserWindow(QMainWindow):
             )
             return
 
-        javac = java.replace("/bin/java", "/bin/javac")
-        if not os.path.isfile(javac):
-            javac = shutil.which("javac")
-
-        print(f"[Coconut] Using java: {java}", flush=True)
-
-        # ── Download JARs from the Raritan device (cached) ──────────
-        jar_dir = os.path.join(os.path.expanduser("~"), ".coconut", "jars")
-        os.makedirs(jar_dir, exist_ok=True)
-
-        ctx = self._get_ssl_context()
-        opener = urllib.request.build_opener(
-            urllib.request.HTTPSHandler(context=ctx)
-        )
-
-        jar_names = [
-            "rc.jar", "rclang_en.jar", "rclang_zhs.jar",
-            "rclang_zht.jar", "rclang_ja.jar",
-        ]
-        jar_paths = []
-        for jar_name in jar_names:
-            jp = os.path.join(jar_dir, jar_name)
-            if not os.path.exists(jp):
-                self.status.showMessage(f"Downloading {jar_name}…", 5000)
-                print(f"[Coconut] Downloading {jar_name} from {host}…", flush=True)
-                try:
-                    with opener.open(f"https://{host}/{jar_name}") as resp:
-                        with open(jp, "wb") as f:
-                            f.write(resp.read())
-                    print(f"[Coconut] Downloaded {jar_name} "
-                          f"({os.path.getsize(jp)} bytes)", flush=True)
-                except Exception as e:
-                    print(f"[Coconut] Could not download {jar_name}: {e}", flush=True)
-                    if jar_name == "rc.jar":
-                        QMessageBox.warning(
-                            self, "Download Failed",
-                            f"Could not download {jar_name} from {host}:\n{e}",
-                        )
-                        return
-            if os.path.exists(jp):
-                jar_paths.append(jp)
+        log.info("Using java: %s", java)
 
-        # ── Compile launcher if needed ──────────────────────────────
-        launcher_src = os.path.join(os.path.dirname(__file__),
-                                    "CoconutAppletLauncher.java")
-        launcher_cls = os.path.join(jar_dir, "CoconutAppletLauncher.class")
-
-        if not os.path.exists(launcher_cls) or (
-            os.path.exists(launcher_src) and
-            os.path.getmtime(launcher_src) > os.path.getmtime(launcher_cls)
-        ):
-            if not javac:
-                QMessageBox.warning(
-                    self, "javac Not Found",
-                    "Need javac to compile the applet launcher.\n"
-                    "Install a full JDK (not just JRE).",
-                )
-                return
-            print(f"[Coconut] Compiling CoconutAppletLauncher…", flush=True)
-            r = subprocess.run(
-                [javac, "-source", "11", "-target", "11",
-                 "-d", jar_dir, launcher_src],
-                capture_output=True, text=True,
-            )
-            if r.returncode != 0:
-                print(f"[Coconut] javac failed: {r.stderr}", flush=True)
-                QMessageBox.critical(self, "Compile Failed", r.stderr)
-                return
-            print("[Coconut] Compilation OK", flush=True)
+        # ── JARs + compiled launcher (usually warmed up by the prefetch) ─
+        self.status.showMessage(f"Preparing KVM viewer for {port_name}…", 5000)
+        try:
+            jar_dir, jar_paths, jars_updated = self._launcher_prep.prepare(
+                java, host)
+        except _LauncherError as e:
+            box = QMessageBox.critical if e.critical else QMessageBox.warning
+            box(self, e.title, e.message)
+            return
 
         # ── Build applet parameter dict ─────────────────────────────
         applet_params = {
@@ -1680,55 +2753,136 @@ class BrowserWindow(QMainWindow):
             "CONNECT_PORT_TYPE": params.get("_connect_ptype", "Dual-VM"),
         }
 
-        print(f"[Coconut] Applet params: {json.dumps(applet_params, indent=2)}",
-              flush=True)
+        log.debug("Applet params: %s", applet_params)
 
         # ── Build launch command ────────────────────────────────────
-        sep = ";" if sys.platform == "win32" else ":"
-        classpath = sep.join([jar_dir] + jar_paths)
         codebase_url = f"https://{host}/"
+        cmd = self._launch_command(java, jar_dir, jar_paths)
 
-        security_file = os.path.join(os.path.dirname(__file__),
-                                     "coconut.java.security")
-
-        cmd = [
-            java,
-            "-Xms256m", "-Xmx512m",
-            "-Djava.awt.headless=false",
-            "-Djava.net.preferIPv4Stack=true",
-            f"-Djava.security.properties={security_file}",
-            "-Djdk.tls.client.protocols=TLSv1,TLSv1.1,TLSv1.2",
-            "-Dhttps.protocols=TLSv1,TLSv1.1,TLSv1.2",
-            "-Dcom.sun.net.ssl.checkRevocation=false",
-            "-cp", classpath,
-            "CoconutAppletLauncher",
-            "nn.pp.rc.RemoteConsoleApplet",
-            codebase_url,
-        ]
-        for k, v in applet_params.items():
-            cmd.append(f"{k}={v}")
+        # One launch request per line: the usual launcher arguments,
+        # tab-separated (see CoconutAppletLauncher.runDaemon).
+        request = "\t".join([
+            "nn.pp.rc.RemoteConsoleApplet", codebase_url,
+            *[f"{k}={v}".replace("\t", " ")
+              for k, v in applet_params.items()],
+        ]).replace("\n", " ")
 
-        print(f"[Coconut] Command: {' '.join(cmd[:8])}…", flush=True)
         self.status.showMessage(f"Launching KVM viewer for {port_name}…", 5000)
 
         try:
-            proc = subprocess.Popen(
-                cmd,
-                stdin=subprocess.DEVNULL,
-                stdout=None,
-                stderr=None,
-                cwd=jar_dir,
-            )
-            print(f"[Coconut] KVM viewer launched (PID {proc.pid})", flush=True)
+            daemon = self._ensure_java_daemon(cmd, restart=jars_updated)
+            daemon.stdin.write(request.encode("utf-8") + b"\n")
+            log.info("KVM viewer requested (JVM PID %s)", daemon.pid)
         except Exception as e:
-            print(f"[Coconut] Failed to launch Java: {e}", flush=True)
+            log.error("Failed to launch Java: %s", e)
             QMessageBox.critical(self, "Launch Failed", str(e))
+            return
+        self._pending_launches[daemon.pid] = \
+            self._pending_launches.get(daemon.pid, 0) + 1
+
+    def _launch_command(self, java, jar_dir, jar_paths):
+        """The launcher JVM command line, rebuilt only if its inputs change.
+
+        Java, the JAR set and the security file are fixed for a session,
+        so connects normally reuse the same list (which also lets
+        _ensure_java_daemon recognise its running JVM by identity).
+        """
+        key = (java, jar_dir, tuple(jar_paths))
+        if self._launch_key != key:
+            sep = ";" if sys.platform == "win32" else ":"
+            security_file = os.path.join(
+                os.path.dirname(os.path.abspath(__file__)),
+                "coconut.java.security")
+            self._cached_launch_prefix = [
+                java,
+                "-Xms256m", "-Xmx512m",
+                "-Djava.awt.headless=false",
+                "-Djava.net.preferIPv4Stack=true",
+                f"-Djava.security.properties={security_file}",
+                "-Djdk.tls.client.protocols=TLSv1,TLSv1.1,TLSv1.2",
+                "-Dhttps.protocols=TLSv1,TLSv1.1,TLSv1.2",
+                "-Dcom.sun.net.ssl.checkRevocation=false",
+                "-cp", sep.join([jar_dir] + list(jar_paths)),
+                "CoconutAppletLauncher",
+                "--daemon",
+            ]
+            self._launch_key = key
+        return self._cached_launch_prefix
+
+    def _ensure_java_daemon(self, cmd, restart=False):
+        """Return the long-lived launcher JVM, starting it if needed.
+
+        Every connect after the first skips JVM start-up, class loading
+        and JIT warm-up.  A new JVM is started when the command changed
+        (different java/classpath) or the JARs/launcher were rebuilt; the
+        old one keeps serving its open sessions and exits on its own once
+        they close, because its stdin is closed here.
+        """
+        d = self._java_daemon
+        if (d is not None and d.poll() is None and not restart
+                and self._java_daemon_cmd is cmd):
+            return d
+        if d is not None:
+            try:
+                d.stdin.close()
+            except Exception:
+                pass
+        log.info("Starting launcher JVM")
+        log.debug("Command: %s…", cmd[:8])
+        # close_fds=False and no cwd lets CPython use posix_spawn()
+        # instead of fork()+exec(), so launching doesn't have to copy the
+        # page tables of this (QtWebEngine-sized) process.  Python's own
+        # fds are non-inheritable, and the classpath is absolute.
+        self._java_daemon = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=None,
+            close_fds=False,
+            bufsize=0,
+        )
+        self._java_daemon_cmd = cmd
+        threading.Thread(
+            target=_relay_launcher_output,
+            args=(self._java_daemon, self._launcher_signals),
+            name="launcher-output", daemon=True,
+        ).start()
+        return self._java_daemon
 
     # ── Proxy ─────────────────────────────────────────────────────────
     def _auto_start_proxy(self):
-        try:
-            self._proxy.start()
-            self.proxy_btn.setChecked(True)
+        self._run_proxy_task(self._proxy.start, interactive=False)
+
+    def _toggle_proxy(self):
+        if self._proxy_task is not None:
+            # Still starting/stopping; the result slot sets the button.
+            self.proxy_btn.setChecked(self._proxy.running)
+            return
+        if self._proxy.running:
+            if getattr(self._proxy, '_external', False):
+                self.proxy_btn.setChecked(True)
+                self.status.showMessage(
+                    "Proxy is managed by systemd service — use "
+                    "'coconut-proxy stop' to control it", 5000)
+                return
+            self._run_proxy_task(self._proxy.stop, interactive=True)
+        else:
+            self._run_proxy_task(self._proxy.start, interactive=True)
+
+    def _run_proxy_task(self, action, interactive):
+        task = ProxyTask(action)
+        task.signals.done.connect(self._on_proxy_done)
+        self._proxy_task = task
+        self._proxy_interactive = interactive
+        self.proxy_btn.setEnabled(False)
+        QThreadPool.globalInstance().start(task)
+
+    @pyqtSlot(bool, str)
+    def _on_proxy_done(self, ok, error):
+        self._proxy_task = None
+        self.proxy_btn.setEnabled(True)
+        self.proxy_btn.setChecked(self._proxy.running)
+        if self._proxy.running:
             url = self._proxy.url
             self.proxy_btn.setText("  Proxy ON  ")
             if getattr(self._proxy, '_external', False):
@@ -1737,46 +2891,33 @@ class BrowserWindow(QMainWindow):
                 self.proxy_label.setText(f"  ●  Proxy ON — {url}")
             self.proxy_label.setStyleSheet(
                 "color: #4ade80; font-weight: bold; font-size: 12px; padding: 0 12px;")
-        except Exception as e:
-            print(f"[Coconut] Proxy auto-start failed: {e}", flush=True)
-            import traceback
-            traceback.print_exc()
-
-    def _toggle_proxy(self):
-        if self._proxy.running:
-            if getattr(self._proxy, '_external', False):
+            if self._proxy_interactive:
                 self.status.showMessage(
-                    "Proxy is managed by systemd service — use "
-                    "'coconut-proxy stop' to control it", 5000)
-                return
-            self._proxy.stop()
-            self.proxy_btn.setChecked(False)
+                    f"TLS Proxy running — other computers can access {url}", 6000)
+        else:
             self.proxy_btn.setText("  Proxy OFF  ")
             self.proxy_label.setText("  ○  Proxy OFF")
             self.proxy_label.setStyleSheet(
                 f"color: {TEXT_SECONDARY}; font-size: 12px; padding: 0 12px;")
-            self.status.showMessage("TLS Proxy stopped", 3000)
-        else:
-            try:
-                self._proxy.start()
-                self.proxy_btn.setChecked(True)
-                url = self._proxy.url
-                self.proxy_btn.setText("  Proxy ON  ")
-                if getattr(self._proxy, '_external', False):
-                    self.proxy_label.setText(f"  ●  Proxy ON (service) — {url}")
+            if self._proxy_interactive:
+                if ok:
+                    self.status.showMessage("TLS Proxy stopped", 3000)
                 else:
-                    self.proxy_label.setText(f"  ●  Proxy ON — {url}")
-                self.proxy_label.setStyleSheet(
-                    "color: #4ade80; font-weight: bold; font-size: 12px; padding: 0 12px;")
-                self.status.showMessage(
-                    f"TLS Proxy running — other computers can access {url}", 6000)
-            except Exception as e:
-                self.proxy_btn.setChecked(False)
-                QMessageBox.warning(self, "Proxy Error",
-                                    f"Failed to start proxy:\n{e}")
+                    QMessageBox.warning(self, "Proxy Error",
+                                        f"Failed to start proxy:\n{error}")
 
     def _find_java(self):
-        """Find a Java binary, preferring JDK 11 (has Applet API)."""
+        """Find a Java binary, preferring JDK 11 (has Applet API).
+
+        A successful lookup is remembered for the session; a miss is not,
+        so installing Java while Coconut is running still works.
+        """
+        if self._java_path is None:
+            self._java_path = self._probe_java()
+        return self._java_path
+
+    @staticmethod
+    def _probe_java():
         candidates = [
             "/opt/homebrew/opt/openjdk@11/bin/java",
             "/usr/lib/jvm/java-11-openjdk-amd64/bin/java",
@@ -1788,14 +2929,20 @@ class BrowserWindow(QMainWindow):
             if os.path.isfile(c) and os.access(c, os.X_OK):
                 return c
 
+        # On Linux /usr/bin/java resolves through /etc/alternatives to a
+        # real JVM, so only the macOS stub is left unresolved here.
         java = shutil.which("java")
         if java and os.path.realpath(java) not in ("/usr/bin/java",):
             return java
 
         if java:
+            # Ask java_home whether the stub has a JVM behind it: a tiny
+            # native tool, instead of booting a JVM for "java -version".
+            probe = ([_JAVA_HOME_TOOL] if os.path.exists(_JAVA_HOME_TOOL)
+                     else [java, "-version"])
             try:
                 r = subprocess.run(
-                    [java, "-version"], capture_output=True, text=True, timeout=5,
+                    probe, capture_output=True, text=True, timeout=5,
                 )
                 if r.returncode == 0 and "Unable to locate" not in r.stderr:
                     return java
@@ -1803,21 +2950,6 @@ class BrowserWindow(QMainWindow):
                 pass
         return None
 
-    def _get_ssl_context(self):
-        ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
-        ctx.options &= ~ssl.OP_NO_TLSv1
-        try:
-            ctx.minimum_version = ssl.TLSVersion.TLSv1
-        except (ValueError, ssl.SSLError):
-            pass
-        try:
-            ctx.set_ciphers("DEFAULT:@SECLEVEL=0")
-        except ssl.SSLError:
-            ctx.set_ciphers("ALL")
-        return ctx
-
     # ── Zoom ────────────────────────────────────────────────────────────
     def _zoom_in(self):
         v = self._current_view()
@@ -1846,12 +2978,18 @@ class BrowserWindow(QMainWindow):
         )
 
     def closeEvent(self, event):
+        if self._bookmark_save_timer.isActive():
+            self._write_bookmarks()
         if self._proxy.running:
             self._proxy.stop()
         super().closeEvent(event)
 
 
 def main():
+    logging.basicConfig(
+        level=logging.DEBUG if os.environ.get("COCONUT_DEBUG") else logging.INFO,
+        format="[%(name)s] %(message)s",
+    )
     _configure_global_ssl()
 
     os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] = " ".join(_CHROMIUM_BASE_FLAGS)
@@ -1868,7 +3006,7 @@ def main():
     if os.path.exists(icon_path):
         app.setWindowIcon(QIcon(icon_path))
 
-    print("[Coconut] Starting — deployJava setter trap + applet stubs active", flush=True)
+    log.info("Starting — deployJava setter trap + applet stubs active")
 
     window = BrowserWindow()
     window.show()
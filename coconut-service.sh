@@ -187,7 +187,7 @@ chmod +x /usr/local/bin/coconut-proxy
 cat > /usr/local/bin/coconut-browser << 'BINEOF'
 #!/bin/bash
 source /etc/coconut.env 2>/dev/null
-export COCONUT_TARGET COCONUT_PORT OPENSSL_CONF
+export COCONUT_TARGET COCONUT_PORT COCONUT_KVM_HOSTS OPENSSL_CONF
 if [[ -z "$XDG_RUNTIME_DIR" ]]; then
     export XDG_RUNTIME_DIR="/tmp/runtime-$(id -u)"
     mkdir -p "$XDG_RUNTIME_DIR"
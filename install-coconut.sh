@@ -167,10 +167,14 @@ if [[ ! -x "$JAVAC" ]]; then
 fi
 
 if [[ -n "$JAVAC" && -f "$INSTALL_DIR/CoconutAppletLauncher.java" ]]; then
-    rm -f /var/lib/coconut/jars/CoconutAppletLauncher.class
+    rm -f /var/lib/coconut/jars/CoconutAppletLauncher*.class
     "$JAVAC" -source 11 -target 11 \
         -d /var/lib/coconut/jars \
         "$INSTALL_DIR/CoconutAppletLauncher.java" 2>/dev/null
+    # Keep a copy beside the source: the proxy installs it into a user's
+    # JAR dir on first connect instead of running javac there.  The
+    # anonymous inner classes (CoconutAppletLauncher$N.class) go too.
+    cp /var/lib/coconut/jars/CoconutAppletLauncher*.class "$INSTALL_DIR/"
     info "Compiled CoconutAppletLauncher.class"
 else
     warn "javac not found — Java launcher will compile on first KVM connect"
@@ -306,7 +310,7 @@ cat > /usr/local/bin/coconut-browser << 'BIN2_EOF'
 #!/bin/bash
 # Launch the Coconut GUI browser (requires desktop/X11)
 source /etc/coconut.env 2>/dev/null
-export COCONUT_TARGET COCONUT_PORT OPENSSL_CONF
+export COCONUT_TARGET COCONUT_PORT COCONUT_KVM_HOSTS OPENSSL_CONF
 
 # Fix XDG_RUNTIME_DIR if not set (common when running as root or via sudo)
 if [[ -z "$XDG_RUNTIME_DIR" ]]; then
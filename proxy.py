@@ -12,13 +12,20 @@ import ssl
 import os
 import sys
 import json
+import functools
+import gzip
+import hashlib
 import subprocess
 import shutil
+import glob
+import queue
 import threading
 import urllib.request
+import urllib.error
 import tempfile
 import re
 import socket
+import sqlite3
 
 # ── Force OpenSSL to allow TLS 1.0 (critical for Linux with OpenSSL 3.x) ────
 _openssl_cnf = os.path.join(os.path.dirname(os.path.abspath(__file__)), "coconut.openssl.cnf")
@@ -29,6 +36,10 @@ if os.path.exists(_openssl_cnf):
 TARGET_HOST = os.environ.get("COCONUT_TARGET", "10.1.10.36")
 TARGET_PORT = int(os.environ.get("COCONUT_TARGET_PORT", "443"))
 LISTEN_PORT = int(os.environ.get("COCONUT_PORT", "8443"))
+try:
+    PROXY_WORKERS = max(1, int(os.environ.get("COCONUT_PROXY_WORKERS", "64")))
+except ValueError:
+    PROXY_WORKERS = 64
 CERT_DIR = os.environ.get("COCONUT_CERT_DIR", os.path.join(os.path.expanduser("~"), ".coconut", "certs"))
 CERT_FILE = os.path.join(CERT_DIR, "coconut.pem")
 KEY_FILE = os.path.join(CERT_DIR, "coconut-key.pem")
@@ -251,17 +262,20 @@ JAVA_EMULATION_JS = r"""
         }
     };
 
-    function patchAllApplets() {
-        var applets = document.querySelectorAll('applet, object[type*="java"]');
-        for (var i = 0; i < applets.length; i++) {
-            var a = applets[i];
-            if (a.__coconutPatched) continue;
-            for (var m in _appletMethods) {
-                if (typeof a[m] !== 'function') a[m] = _appletMethods[m];
-            }
-            a.__coconutPatched = true;
-            if (a.id) console.log('[Coconut] Patched applet "' + a.id + '"');
+    var _APPLET_SEL = 'applet, object[type*="java"]';
+
+    function patchApplet(a) {
+        if (a.__coconutPatched) return;
+        for (var m in _appletMethods) {
+            if (typeof a[m] !== 'function') a[m] = _appletMethods[m];
         }
+        a.__coconutPatched = true;
+        if (a.id) console.log('[Coconut] Patched applet "' + a.id + '"');
+    }
+
+    function patchAllApplets() {
+        var applets = document.querySelectorAll(_APPLET_SEL);
+        for (var i = 0; i < applets.length; i++) patchApplet(applets[i]);
     }
 
     if (document.readyState === 'loading') {
@@ -269,7 +283,24 @@ JAVA_EMULATION_JS = r"""
     } else {
         patchAllApplets();
     }
-    var _patchObs = new MutationObserver(function() { patchAllApplets(); });
+
+    // Only the freshly added subtrees are inspected — never the whole DOM.
+    // Patching stays in the observer callback rather than a
+    // requestAnimationFrame: inline scripts right after an <applet> tag
+    // call its methods before the next frame.
+    var _patchObs = new MutationObserver(function(muts) {
+        for (var i = 0; i < muts.length; i++) {
+            var added = muts[i].addedNodes;
+            for (var j = 0; j < added.length; j++) {
+                var n = added[j];
+                if (n.nodeType !== 1) continue;
+                if (n.matches(_APPLET_SEL)) patchApplet(n);
+                if (!n.firstElementChild) continue;
+                var inner = n.querySelectorAll(_APPLET_SEL);
+                for (var k = 0; k < inner.length; k++) patchApplet(inner[k]);
+            }
+        }
+    });
     _patchObs.observe(document.documentElement || document.body || document,
                       {childList: true, subtree: true});
 })();
@@ -279,32 +310,126 @@ CSS_INJECTION = """
 <style>applet > * { display: none !important; }</style>
 """
 
+# The emulation JS is served once as a cacheable script instead of being
+# inlined into every HTML page; the version query busts the browser cache
+# whenever the shim (or the target host baked into it) changes.
+_SHIM_PATH = "/__coconut_shim__.js"
+_SHIM_BYTES = JAVA_EMULATION_JS.encode("utf-8")
+_SHIM_GZ = gzip.compress(_SHIM_BYTES, compresslevel=9)
+_SHIM_HASH = hashlib.sha1(_SHIM_BYTES).hexdigest()[:12]
+_SHIM_ETAG = f'"{_SHIM_HASH}"'
+_SHIM_GZ_ETAG = f'"{_SHIM_HASH}-gz"'
+_SHIM_URL = f"{_SHIM_PATH}?v={_SHIM_HASH}"
+HTML_INJECTION = (f'<script src="{_SHIM_URL}"></script>\n{CSS_INJECTION}\n'
+                  .encode("utf-8"))
+
+
+def _accepts_gzip(accept_encoding):
+    """True if an Accept-Encoding header allows a gzip response.
+
+    Honours q-values, so ``gzip;q=0`` (or ``*;q=0`` with no explicit
+    gzip entry) means identity.
+    """
+    star = None
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding in ("gzip", "x-gzip"):
+            return q > 0
+        if coding == "*":
+            star = q > 0
+    return bool(star)
+
 
 # ── Certificate generation ────────────────────────────────────────────────────
 
 def ensure_certs():
-    """Generate a self-signed certificate if one doesn't exist."""
+    """Generate a self-signed certificate if one doesn't exist.
+
+    ECDSA P-256: near-instant to generate, and far cheaper than RSA-2048
+    to sign with on every client TLS handshake.
+    """
     os.makedirs(CERT_DIR, exist_ok=True)
     if os.path.exists(CERT_FILE) and os.path.exists(KEY_FILE):
         return
 
     print("[Coconut Proxy] Generating self-signed certificate…")
 
-    # Try with -addext first (OpenSSL 1.1.1+), fall back for older versions
-    cmd = [
-        "openssl", "req", "-x509", "-newkey", "rsa:2048",
-        "-keyout", KEY_FILE, "-out", CERT_FILE,
-        "-days", "3650", "-nodes",
-        "-subj", "/CN=Coconut KVM Proxy/O=Coconut",
-    ]
-    r = subprocess.run(cmd + ["-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1"],
-                       capture_output=True)
-    if r.returncode != 0:
-        subprocess.run(cmd, check=True, capture_output=True)
+    if not _generate_cert_in_process():
+        # Try with -addext first (OpenSSL 1.1.1+), fall back for older versions
+        cmd = [
+            "openssl", "req", "-x509",
+            "-newkey", "ec", "-pkeyopt", "ec_paramgen_curve:prime256v1",
+            "-keyout", KEY_FILE, "-out", CERT_FILE,
+            "-days", "3650", "-nodes",
+            "-subj", "/CN=Coconut KVM Proxy/O=Coconut",
+        ]
+        r = subprocess.run(cmd + ["-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1"],
+                           capture_output=True)
+        if r.returncode != 0:
+            subprocess.run(cmd, check=True, capture_output=True)
 
     print(f"[Coconut Proxy] Certificate saved to {CERT_DIR}")
 
 
+def _generate_cert_in_process():
+    """Write the self-signed cert with ``cryptography``, without forking.
+
+    Returns False when the package isn't installed; ensure_certs() then
+    falls back to the openssl CLI.
+    """
+    try:
+        import datetime
+        import ipaddress
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from cryptography.x509.oid import NameOID
+    except ImportError:
+        return False
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([
+        x509.NameAttribute(NameOID.COMMON_NAME, "Coconut KVM Proxy"),
+        x509.NameAttribute(NameOID.ORGANIZATION_NAME, "Coconut"),
+    ])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + datetime.timedelta(days=3650))
+        .add_extension(x509.SubjectAlternativeName([
+            x509.DNSName("localhost"),
+            x509.IPAddress(ipaddress.ip_address("127.0.0.1")),
+        ]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+
+    key_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.TraditionalOpenSSL,
+        serialization.NoEncryption(),
+    )
+    fd = os.open(KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key_pem)
+    with open(CERT_FILE, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    return True
+
+
 # ── Backend TLS 1.0 connection ────────────────────────────────────────────────
 
 def _make_legacy_ssl_context():
@@ -333,14 +458,128 @@ def _make_legacy_ssl_context():
     return ctx
 
 
+@functools.lru_cache(maxsize=None)
+def _legacy_ctx():
+    """The one client context for the KVM, so its session cache survives."""
+    return _make_legacy_ssl_context()
+
+
+# Last TLS session per (host, port), offered again on the next handshake.
+_tls_sessions = {}
+
+
+class _ResumingHTTPSConnection(http.client.HTTPSConnection):
+    """HTTPSConnection that resumes the previous TLS session to its host.
+
+    Turns the full RSA/DH handshake of every new backend connection into
+    an abbreviated one once the device has issued a session.
+    """
+
+    def connect(self):
+        # HTTPConnection.connect() already disables Nagle; keepalive lets
+        # the OS notice a pooled connection the device silently dropped.
+        http.client.HTTPConnection.connect(self)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        key = (self.host, self.port)
+        server_hostname = self._tunnel_host or self.host
+        self.sock = self._context.wrap_socket(
+            self.sock, server_hostname=server_hostname,
+            session=_tls_sessions.get(key))
+        if self.sock.session is not None:
+            _tls_sessions[key] = self.sock.session
+
+
 def make_backend_connection():
     """Create an HTTPS connection to the Raritan KVM using TLS 1.0."""
-    ctx = _make_legacy_ssl_context()
-    return http.client.HTTPSConnection(TARGET_HOST, TARGET_PORT, context=ctx, timeout=30)
+    return _ResumingHTTPSConnection(TARGET_HOST, TARGET_PORT,
+                                    context=_legacy_ctx(), timeout=30)
+
+
+# Idle keep-alive connections to the KVM.  LIFO so the most recently used
+# (least likely to have been timed out by the device) is handed out first.
+_backend_pool = queue.LifoQueue(maxsize=32)
+
+
+def _get_backend_connection():
+    """Return ``(conn, reused)``: a pooled connection, or a new one."""
+    while True:
+        try:
+            conn = _backend_pool.get_nowait()
+        except queue.Empty:
+            return make_backend_connection(), False
+        if (conn.host, conn.port) == (TARGET_HOST, TARGET_PORT):
+            return conn, True
+        conn.close()
+
+
+def _put_backend_connection(conn):
+    try:
+        _backend_pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+
+def backend_request(method, path, body, headers):
+    """Send one request to the KVM and return ``(conn, resp)``.
+
+    The body of *resp* is left unread; hand both to
+    release_backend_connection() when done.  The TLS 1.0 connection is
+    kept alive and pooled, so the handshake is paid once rather than per
+    proxied request.  A pooled connection the device has dropped in the
+    meantime is retried once on a fresh one.
+    """
+    conn, reused = _get_backend_connection()
+    try:
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+        except (ConnectionError, ssl.SSLEOFError):
+            if not reused:
+                raise
+            conn.close()
+            conn = make_backend_connection()
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+    except BaseException:
+        conn.close()
+        raise
+    return conn, resp
+
+
+def release_backend_connection(conn, resp):
+    """Pool *conn* again if *resp* was read to the end and may be reused."""
+    if resp.will_close or not resp.isclosed():
+        conn.close()
+    else:
+        _put_backend_connection(conn)
+
+
+# Reusable request-body buffers for forwarded POST/PUTs.  Bodies above
+# _BODY_BUF_MAX are read normally so the pool never pins much memory.
+_BODY_BUF_MAX = 256 * 1024
+_body_bufs = queue.LifoQueue(maxsize=16)
+
+
+def _get_body_buf(n):
+    try:
+        buf = _body_bufs.get_nowait()
+    except queue.Empty:
+        return bytearray(n)
+    if len(buf) < n:
+        buf.extend(bytes(n - len(buf)))
+    return buf
+
+
+def _put_body_buf(buf):
+    try:
+        _body_bufs.put_nowait(buf)
+    except queue.Full:
+        pass
 
 
 # ── Java launcher ─────────────────────────────────────────────────────────────
 
+@functools.lru_cache(maxsize=1)
 def find_java():
     candidates = [
         "/opt/homebrew/opt/openjdk@11/bin/java",
@@ -353,10 +592,129 @@ def find_java():
     return shutil.which("java")
 
 
+# Set once a JVM started from the compiled launcher has got through
+# start-up; later connects skip the stat()s and the javac check until the
+# proxy restarts.
+_launcher_ready = False
+# Seconds a freshly started launcher JVM must stay up to count as working.
+_LAUNCHER_STARTUP_GRACE = 10
+# Cleared if a JVM started from the bundled classes dies during start-up.
+_bundled_launcher_ok = True
+
+# Launcher class prebuilt by install-coconut.sh next to the source, so the
+# first connect doesn't have to start javac.
+_BUNDLED_LAUNCHER_CLASS = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "CoconutAppletLauncher.class")
+
+
+def _launcher_classes(directory):
+    """The launcher class files in *directory*, inner classes included."""
+    return glob.glob(os.path.join(glob.escape(directory),
+                                  "CoconutAppletLauncher*.class"))
+
+
+def _install_bundled_launcher(launcher_src, jar_dir):
+    """Copy the prebuilt launcher classes into *jar_dir* if they are current."""
+    if not _bundled_launcher_ok:
+        return False
+    try:
+        bundled_mtime = os.path.getmtime(_BUNDLED_LAUNCHER_CLASS)
+        if bundled_mtime < os.path.getmtime(launcher_src):
+            return False
+        for path in _launcher_classes(os.path.dirname(_BUNDLED_LAUNCHER_CLASS)):
+            shutil.copy2(path, jar_dir)
+    except OSError:
+        return False
+    return True
+
+
+def _confirm_launcher(proc, jar_dir, bundled):
+    """Mark the launcher ready once *proc* survives JVM start-up.
+
+    A JVM that fails straight away (say, a launcher class whose inner
+    classes are missing) gets the compiled classes removed instead, so
+    the next connect compiles them again.
+    """
+    global _launcher_ready, _bundled_launcher_ok
+    try:
+        rc = proc.wait(timeout=_LAUNCHER_STARTUP_GRACE)
+    except subprocess.TimeoutExpired:
+        rc = 0
+    if rc == 0:
+        _launcher_ready = True
+        return
+    print(f"[Coconut Proxy] Launcher JVM exited with {rc} during start-up; "
+          f"it will be rebuilt on the next connect")
+    if bundled:
+        _bundled_launcher_ok = False
+    for path in _launcher_classes(jar_dir):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _fetch_jar(opener, url, jp, db):
+    """Make *jp* a complete, current copy of *url*; return False if unusable.
+
+    *db* is the browser's JarCache database (``cache.sqlite`` in the JAR
+    directory), so both front ends agree on what is on disk.  A file is
+    only trusted if the cache recorded its download: it is revalidated
+    with a conditional GET, kept as-is if the device sent no validators
+    or cannot be reached, and anything else is fetched again into a temp
+    file and renamed into place.
+    """
+    row = None
+    if os.path.exists(jp):
+        row = db.execute("SELECT etag, last_modified FROM jars WHERE url = ?",
+                         (url,)).fetchone()
+    if row == (None, None):
+        return True
+    req = urllib.request.Request(url)
+    if row:
+        if row[0]:
+            req.add_header("If-None-Match", row[0])
+        if row[1]:
+            req.add_header("If-Modified-Since", row[1])
+    try:
+        resp = opener.open(req, timeout=10)
+    except urllib.error.HTTPError as e:
+        if row and e.code == 304:
+            return True
+        print(f"[Coconut Proxy] Failed to download {url}: {e}")
+        return False
+    except Exception as e:
+        print(f"[Coconut Proxy] Failed to download {url}: {e}"
+              + (" — using cached copy" if row else ""))
+        return row is not None
+    tmp = tempfile.NamedTemporaryFile(dir=os.path.dirname(jp), prefix=".jar-", delete=False)
+    try:
+        with resp, tmp:
+            data = resp.read()
+            tmp.write(data)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.replace(tmp.name, jp)
+    except Exception as e:
+        try:
+            os.unlink(tmp.name)
+        except OSError:
+            pass
+        print(f"[Coconut Proxy] Failed to download {url}: {e}")
+        return row is not None
+    with db:
+        db.execute("INSERT OR REPLACE INTO jars VALUES (?, ?, ?, ?)",
+                   (url, resp.headers.get("ETag"), resp.headers.get("Last-Modified"),
+                    hashlib.sha256(data).hexdigest()))
+    print(f"[Coconut Proxy] Downloaded {os.path.basename(jp)}")
+    return True
+
+
 def launch_kvm_viewer(params):
     """Launch the standalone Java KVM viewer."""
     java = find_java()
     if not java:
+        find_java.cache_clear()   # look again next time; Java may get installed
         return {"error": "Java 11 not found"}
 
     host = params.get("_connect_host", TARGET_HOST)
@@ -364,37 +722,38 @@ def launch_kvm_viewer(params):
     os.makedirs(jar_dir, exist_ok=True)
 
     opener = urllib.request.build_opener(
-        urllib.request.HTTPSHandler(context=_make_legacy_ssl_context()))
+        urllib.request.HTTPSHandler(context=_legacy_ctx()))
 
     jar_names = ["rc.jar", "rclang_en.jar"]
     jar_paths = []
-    for jar_name in jar_names:
-        jp = os.path.join(jar_dir, jar_name)
-        if not os.path.exists(jp):
-            url = f"https://{host}/{jar_name}"
-            try:
-                resp = opener.open(url, timeout=10)
-                with open(jp, "wb") as f:
-                    f.write(resp.read())
-                print(f"[Coconut Proxy] Downloaded {jar_name}")
-            except Exception as e:
-                print(f"[Coconut Proxy] Failed to download {jar_name}: {e}")
-                continue
-        jar_paths.append(jp)
+    db = sqlite3.connect(os.path.join(jar_dir, "cache.sqlite"))
+    try:
+        db.execute("CREATE TABLE IF NOT EXISTS jars (url TEXT PRIMARY KEY, "
+                   "etag TEXT, last_modified TEXT, sha256 TEXT)")
+        for jar_name in jar_names:
+            jp = os.path.join(jar_dir, jar_name)
+            if _fetch_jar(opener, f"https://{host}/{jar_name}", jp, db):
+                jar_paths.append(jp)
+    finally:
+        db.close()
 
     launcher_src = os.path.join(os.path.dirname(__file__), "CoconutAppletLauncher.java")
     launcher_class = os.path.join(jar_dir, "CoconutAppletLauncher.class")
-    if not os.path.exists(launcher_class) or \
-       os.path.getmtime(launcher_src) > os.path.getmtime(launcher_class):
-        javac = java.replace("/bin/java", "/bin/javac")
-        if not os.path.isfile(javac):
-            javac = shutil.which("javac")
-        if javac:
-            r = subprocess.run(
-                [javac, "-source", "11", "-target", "11", "-d", jar_dir, launcher_src],
-                capture_output=True, text=True)
-            if r.returncode != 0:
-                return {"error": f"javac failed: {r.stderr}"}
+    bundled = False
+    if not _launcher_ready and not (
+            os.path.exists(launcher_class) and
+            os.path.getmtime(launcher_src) <= os.path.getmtime(launcher_class)):
+        bundled = _install_bundled_launcher(launcher_src, jar_dir)
+        if not bundled:
+            javac = java.replace("/bin/java", "/bin/javac")
+            if not os.path.isfile(javac):
+                javac = shutil.which("javac")
+            if javac:
+                r = subprocess.run(
+                    [javac, "-source", "11", "-target", "11", "-d", jar_dir, launcher_src],
+                    capture_output=True, text=True)
+                if r.returncode != 0:
+                    return {"error": f"javac failed: {r.stderr}"}
 
     sep = ";" if sys.platform == "win32" else ":"
     classpath = sep.join([jar_dir] + jar_paths)
@@ -446,7 +805,10 @@ def launch_kvm_viewer(params):
         cmd.append(f"{k}={v}")
 
     print(f"[Coconut Proxy] Launching KVM viewer for {port_name}…")
-    subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=None, stderr=None, cwd=jar_dir)
+    proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=None, stderr=None, cwd=jar_dir)
+    if not _launcher_ready:
+        threading.Thread(target=_confirm_launcher, args=(proc, jar_dir, bundled),
+                         daemon=True).start()
     return {"status": "launched", "port": port_name}
 
 
@@ -454,14 +816,68 @@ def launch_kvm_viewer(params):
 
 BLOCKED_HOSTS = {"java.sun.com", "java.com", "oracle.com", "www.java.com",
                  "www.oracle.com", "download.oracle.com", "javadl.oracle.com"}
+# Request headers the proxy sets itself, and backend response headers it
+# drops (re-framed or meaningless once relayed).
+_OVERRIDDEN_REQ_HEADERS = frozenset({"host", "user-agent", "connection"})
+_HOP_HEADERS = frozenset({"transfer-encoding", "content-length",
+                          "content-encoding", "connection"})
+
+_BLOCKED_RE = re.compile("|".join(re.escape(h) for h in sorted(BLOCKED_HOSTS)))
 
 SPOOFED_UA = ("Mozilla/5.0 (Windows NT 10.0; WOW64; Trident/7.0; rv:11.0) "
               "like Gecko Java/1.8.0_201")
 
+_HEAD_CLOSE = b"</head>"
+_BODY_OPEN = b"<body"
+
+# Cheap gate for the two redirect regexes below: most pages never mention
+# a Java download site, and one search beats two full regex passes.
+_JAVA_SITE_RE = re.compile(rb'java\.com|java\.sun\.com|oracle\.com', re.IGNORECASE)
+
+# Meta refresh redirects to Java download sites
+_META_REFRESH_RE = re.compile(
+    rb'<meta[^>]*http-equiv=["\']?refresh["\']?[^>]*'
+    rb'(java\.com|java\.sun\.com|oracle\.com)[^>]*>', re.IGNORECASE)
+
+# location.replace/assign redirects to Java sites in inline scripts
+_LOC_REDIRECT_RE = re.compile(
+    rb'(location\s*\.\s*(replace|assign|href\s*=))\s*\(\s*["\'][^"\']*'
+    rb'(java\.com|java\.sun\.com|oracle\.com)[^"\']*["\']\s*\)', re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=None)
+def _target_origin_re(host, port):
+    """Bytes regex matching any spelling of the KVM origin.
+
+    One alternation, most specific spelling first, so a body is rewritten
+    in a single pass instead of one replace() per spelling.
+    """
+    return re.compile("|".join(re.escape(o) for o in (
+        f"https://{host}:{port}", f"https://{host}", f"http://{host}",
+    )).encode("ascii"))
+
+
+def _rewrite_origins_bytes(data, proxy_origin, host, port):
+    if host.encode("ascii") not in data:
+        return data
+    origin = proxy_origin.encode("latin-1")
+    return _target_origin_re(host, port).sub(lambda m: origin, data)
+
+
+def _rewrite_origins(text, proxy_origin):
+    """_rewrite_origins_bytes() for a header value, against the current target."""
+    # Header values are latin-1 on the wire, so this round-trips losslessly.
+    return _rewrite_origins_bytes(text.encode("latin-1"), proxy_origin,
+                                  TARGET_HOST, TARGET_PORT).decode("latin-1")
+
 
 class CoconutProxyHandler(http.server.BaseHTTPRequestHandler):
     """Reverse proxy that translates TLS 1.3 ↔ TLS 1.0 and injects Java emulation."""
 
+    # Idle keep-alive/preconnect sockets give their pool worker back after
+    # this many seconds instead of holding it until the browser closes them.
+    timeout = 120
+
     def log_message(self, fmt, *args):
         print(f"[Proxy] {fmt % args}", flush=True)
 
@@ -495,6 +911,11 @@ class CoconutProxyHandler(http.server.BaseHTTPRequestHandler):
                 self._send_json(500, {"error": str(e)})
             return
 
+        # Serve the Java emulation shim referenced from injected pages
+        if self.path.split("?", 1)[0] == _SHIM_PATH:
+            self._serve_shim()
+            return
+
         # Serve launcher script for remote clients
         if self.path.startswith("/__coconut_launcher__"):
             self._serve_launcher_script()
@@ -509,7 +930,7 @@ class CoconutProxyHandler(http.server.BaseHTTPRequestHandler):
             return
 
         # Block Java download domains
-        if any(d in self.path for d in BLOCKED_HOSTS):
+        if _BLOCKED_RE.search(self.path):
             self._send_json(403, {"blocked": True})
             return
 
@@ -521,89 +942,111 @@ class CoconutProxyHandler(http.server.BaseHTTPRequestHandler):
 
         # Read request body
         content_len = int(self.headers.get("Content-Length", 0))
-        body = self.rfile.read(content_len) if content_len else None
+        buf = view = body = None
+        if 0 < content_len <= _BODY_BUF_MAX:
+            buf = _get_body_buf(content_len)
+            view = memoryview(buf)[:content_len]
+            n = self.rfile.readinto(view)
+            body = view[:n]
+        elif content_len:
+            body = self.rfile.read(content_len)
 
         # Forward to backend
         try:
-            conn = make_backend_connection()
-            headers = dict(self.headers)
-            headers.pop("Host", None)
+            headers = {k: v for k, v in self.headers.items()
+                       if k.lower() not in _OVERRIDDEN_REQ_HEADERS}
             headers["Host"] = f"{TARGET_HOST}:{TARGET_PORT}"
             headers["User-Agent"] = SPOOFED_UA
+            headers["Connection"] = "keep-alive"
 
-            conn.request(method, self.path, body=body, headers=headers)
-            resp = conn.getresponse()
-
-            resp_body = resp.read()
+            conn, resp = backend_request(method, self.path, body, headers)
+        except Exception as e:
+            error_msg = f"Proxy error: {e}"
+            print(f"[Proxy] {error_msg}", flush=True)
+            self._send_json(502, {"error": error_msg})
+            return
+        finally:
+            if buf is not None:
+                body.release()
+                view.release()
+                _put_body_buf(buf)
 
+        origin = self._proxy_origin()
+        sent_headers = False
+        try:
             # Check content type for HTML injection
             content_type = resp.getheader("Content-Type", "")
             if "text/html" in content_type:
-                resp_body = self._inject_into_html(resp_body)
-
-            # Rewrite Location headers
-            self.send_response(resp.status)
-            for key, val in resp.getheaders():
-                lower_key = key.lower()
-                if lower_key in ("transfer-encoding", "content-length",
-                                 "content-encoding", "connection"):
-                    continue
-                if lower_key == "location":
-                    proxy_origin = self._proxy_origin()
-                    val = val.replace(f"https://{TARGET_HOST}:{TARGET_PORT}", proxy_origin)
-                    val = val.replace(f"https://{TARGET_HOST}", proxy_origin)
-                    val = val.replace(f"http://{TARGET_HOST}", proxy_origin)
-                if lower_key == "set-cookie":
-                    val = val.replace("; Secure", "")
-                self.send_header(key, val)
-
-            self.send_header("Content-Length", str(len(resp_body)))
-            self.end_headers()
-            self.wfile.write(resp_body)
-            conn.close()
-
+                resp_body = self._inject_into_html(resp.read(), origin)
+                sent_headers = True
+                self._send_backend_headers(resp, len(resp_body), origin)
+                self.wfile.write(resp_body)
+            else:
+                # Everything else (JARs, images, scripts) is relayed in
+                # 64 KiB chunks rather than buffered whole.
+                sent_headers = True
+                self._send_backend_headers(
+                    resp, resp.getheader("Content-Length"), origin)
+                while True:
+                    chunk = resp.read(65536)
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
         except Exception as e:
             error_msg = f"Proxy error: {e}"
             print(f"[Proxy] {error_msg}", flush=True)
-            self._send_json(502, {"error": error_msg})
+            if sent_headers:
+                # Too late for an error page; cut the response short.
+                self.close_connection = True
+            else:
+                self._send_json(502, {"error": error_msg})
+        finally:
+            release_backend_connection(conn, resp)
+
+    def _send_backend_headers(self, resp, length, origin):
+        """Send the status line and rewritten headers of a backend response."""
+        self.send_response(resp.status)
+        for key, val in resp.getheaders():
+            lower_key = key.lower()
+            if lower_key in _HOP_HEADERS:
+                continue
+            # Rewrite Location headers
+            if lower_key == "location":
+                val = _rewrite_origins(val, origin)
+            elif lower_key == "set-cookie":
+                val = val.replace("; Secure", "")
+            self.send_header(key, val)
+
+        if length is not None:
+            self.send_header("Content-Length", str(length))
+        self.end_headers()
 
-    def _inject_into_html(self, body):
-        """Inject Java emulation JS and CSS into HTML responses."""
-        try:
-            text = body.decode("utf-8", errors="replace")
-        except Exception:
-            return body
+    def _inject_into_html(self, body, origin):
+        """Inject Java emulation JS and CSS into HTML responses.
 
+        Works on the raw bytes, so the page is neither decoded nor
+        re-encoded (and non-UTF-8 pages pass through unmangled).
+        """
         # Rewrite references to the target host to go through proxy
-        proxy_origin = self._proxy_origin()
-        text = text.replace(f"https://{TARGET_HOST}:{TARGET_PORT}", proxy_origin)
-        text = text.replace(f"https://{TARGET_HOST}", proxy_origin)
-        text = text.replace(f"http://{TARGET_HOST}", proxy_origin)
-
-        # Strip meta refresh redirects to Java download sites
-        text = re.sub(
-            r'<meta[^>]*http-equiv=["\']?refresh["\']?[^>]*'
-            r'(java\.com|java\.sun\.com|oracle\.com)[^>]*>',
-            '', text, flags=re.IGNORECASE)
-
-        # Block location.replace/assign redirects to Java sites in inline scripts
-        text = re.sub(
-            r'(location\s*\.\s*(replace|assign|href\s*=))\s*\(\s*["\'][^"\']*'
-            r'(java\.com|java\.sun\.com|oracle\.com)[^"\']*["\']\s*\)',
-            'void(0)', text, flags=re.IGNORECASE)
+        body = _rewrite_origins_bytes(body, origin, TARGET_HOST,
+                                      TARGET_PORT)
+
+        if _JAVA_SITE_RE.search(body):
+            # Strip meta refresh redirects to Java download sites
+            body = _META_REFRESH_RE.sub(b'', body)
+
+            # Block location.replace/assign redirects to Java sites in inline scripts
+            body = _LOC_REDIRECT_RE.sub(b'void(0)', body)
 
         # Inject our JS before </head> or at the start of <body>
-        injection = f"<script>{JAVA_EMULATION_JS}</script>\n{CSS_INJECTION}\n"
-        if "</head>" in text:
-            text = text.replace("</head>", injection + "</head>", 1)
-        elif "<body" in text:
-            idx = text.index("<body")
-            end = text.index(">", idx)
-            text = text[:end+1] + injection + text[end+1:]
-        else:
-            text = injection + text
-
-        return text.encode("utf-8")
+        idx = body.find(_HEAD_CLOSE)
+        if idx < 0:
+            idx = body.find(_BODY_OPEN)
+            if idx >= 0:
+                idx = body.index(b">", idx) + 1
+        if idx < 0:
+            return HTML_INJECTION + body
+        return b"".join((body[:idx], HTML_INJECTION, body[idx:]))
 
     def _send_json(self, code, data):
         body = json.dumps(data).encode("utf-8")
@@ -614,6 +1057,27 @@ class CoconutProxyHandler(http.server.BaseHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(body)
 
+    def _serve_shim(self):
+        """The emulation JS, pre-gzipped, immutable under its versioned URL."""
+        gz = _accepts_gzip(self.headers.get("Accept-Encoding", ""))
+        etag = _SHIM_GZ_ETAG if gz else _SHIM_ETAG
+        data = _SHIM_GZ if gz else _SHIM_BYTES
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/javascript")
+        self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+        self.send_header("ETag", etag)
+        self.send_header("Vary", "Accept-Encoding")
+        if gz:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
     def _serve_local_file(self, filename, content_type):
         filepath = os.path.join(os.path.dirname(__file__), filename)
         if not os.path.isfile(filepath):
@@ -772,9 +1236,21 @@ CP=".:rc.jar:rclang_en.jar"
 # ── Main ──────────────────────────────────────────────────────────────────────
 
 class ThreadedHTTPServer(http.server.HTTPServer):
-    """Handle each request in a new thread."""
+    """Handle each connection on a bounded pool of daemon worker threads.
+
+    Workers are started on demand up to max_workers and are daemons, like
+    the per-connection threads they replace, so a worker parked on an idle
+    keep-alive socket never keeps the interpreter alive after shutdown.
+    """
     allow_reuse_address = True
-    daemon_threads = True
+    max_workers = PROXY_WORKERS
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._requests = queue.SimpleQueue()
+        self._workers_lock = threading.Lock()
+        self._workers = 0
+        self._idle = 0
 
     def server_bind(self):
         self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
@@ -784,11 +1260,32 @@ class ThreadedHTTPServer(http.server.HTTPServer):
             pass
         super().server_bind()
 
+    def get_request(self):
+        # Small requests and responses (the launch POST, KVM XML calls)
+        # shouldn't wait out Nagle's algorithm.
+        sock, addr = super().get_request()
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        return sock, addr
+
     def process_request(self, request, client_address):
-        t = threading.Thread(target=self.process_request_thread,
-                             args=(request, client_address))
-        t.daemon = True
-        t.start()
+        with self._workers_lock:
+            if self._idle:
+                self._idle -= 1
+            elif self._workers < self.max_workers:
+                self._workers += 1
+                threading.Thread(target=self._worker, daemon=True,
+                                 name=f"coconut-{self._workers}").start()
+        self._requests.put((request, client_address))
+
+    def _worker(self):
+        while True:
+            item = self._requests.get()
+            if item is None:
+                return
+            self.process_request_thread(*item)
+            with self._workers_lock:
+                self._idle += 1
 
     def process_request_thread(self, request, client_address):
         try:
@@ -798,6 +1295,20 @@ class ThreadedHTTPServer(http.server.HTTPServer):
         finally:
             self.shutdown_request(request)
 
+    def server_close(self):
+        super().server_close()
+        # Drop connections nobody picked up yet, then release idle workers.
+        while True:
+            try:
+                item = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                self.shutdown_request(item[0])
+        with self._workers_lock:
+            for _ in range(self._workers):
+                self._requests.put(None)
+
 
 def main():
     ensure_certs()